@@ -1,11 +1,15 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models import User, TokenData
 from database import UserDatabase
+from cache import principal_cache
+from metrics import password_latency
 import os
 
 # Security configuration
@@ -16,6 +20,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# bcrypt is deliberately slow; run it on a small dedicated pool so it never
+# blocks the event loop (bcrypt releases the GIL while hashing)
+password_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+    thread_name_prefix="bcrypt"
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,6 +35,18 @@ def get_password_hash(password: str) -> str:
     """Generate password hash"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password on the bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    with password_latency.time(operation="verify"):
+        return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash on the bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    with password_latency.time(operation="hash"):
+        return await loop.run_in_executor(password_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -41,7 +64,7 @@ async def authenticate_user(username: str, password: str) -> Optional[dict]:
     user = await UserDatabase.get_user_by_username(username)
     if not user:
         return None
-    if not verify_password(password, user["password_hash"]):
+    if not await verify_password_async(password, user["password_hash"]):
         return None
     return user
 
@@ -53,8 +76,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
@@ -66,6 +93,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     user = await UserDatabase.get_user_by_username(username=token_data.username)
     if user is None:
         raise credentials_exception
+    # Cache the verified principal; never beyond the token's own expiry
+    principal_cache.set(token, user, payload.get("exp"))
     return user
 
 async def create_default_admin():
@@ -75,7 +104,7 @@ async def create_default_admin():
         admin_user = {
             "username": "admin",
             "email": "kclynch@uh.edu",
-            "password_hash": get_password_hash("admin123"),  # Change this password!
+            "password_hash": await get_password_hash_async("admin123"),  # Change this password!
             "role": "admin"
         }
         await UserDatabase.create_user(admin_user)
@@ -0,0 +1,277 @@
+"""HTTP load and latency benchmark for the resume API.
+
+By default ``server:app`` is driven in-process through an httpx ASGI client
+on the in-memory storage backend (STORAGE_BACKEND=memory, or set it to
+sqlite), so no MongoDB (or network) is needed. With
+``--url`` the same scenarios run against a live server instead (e.g. a
+local ``uvicorn server:app``), using its real database.
+
+Each scenario is one route from api_router. It is run for ``--requests``
+requests with ``--concurrency`` concurrent clients, and its throughput,
+latency percentiles and status codes are written as JSON.
+
+Usage (from the repository root; needs httpx):
+
+    python -m benchmarks.bench_http
+    python -m benchmarks.bench_http --scenarios resume pdf login --concurrency 1 8 32
+    python -m benchmarks.bench_http --url http://localhost:8001 --password <admin password>
+    python -m benchmarks.bench_http --compare benchmarks/results/before.json
+"""
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import httpx
+
+DEFAULT_OUTPUT = ROOT_DIR / "benchmarks" / "results" / "bench_http.json"
+
+class Scenario(NamedTuple):
+    group: str
+    # send(client, context, i) -> response for the i-th request
+    send: Callable[[httpx.AsyncClient, dict, int], Awaitable[httpx.Response]]
+    # Optional untimed preparation, e.g. creating the entries a DELETE will remove
+    setup: Optional[Callable[[httpx.AsyncClient, dict, int], Awaitable[None]]] = None
+
+def _experience(i: int) -> dict:
+    return {
+        "position": f"Benchmark Engineer {i}",
+        "company": "Load Test Inc.",
+        "location": "Houston, TX",
+        "duration": "Jan 2020 - Dec 2021",
+        "description": "Entry created by the HTTP benchmark.",
+        "achievements": ["Handled a lot of requests"],
+    }
+
+async def _create_experiences(client: httpx.AsyncClient, context: dict, count: int) -> None:
+    context["experience_ids"] = []
+    for i in range(count):
+        r = await client.post("/api/resume/experience", json=_experience(i), headers=context["auth"])
+        context["experience_ids"].append(r.json()["data"]["id"])
+
+async def _delete_experience(client: httpx.AsyncClient, context: dict, i: int) -> httpx.Response:
+    exp_id = context["experience_ids"].pop()
+    return await client.delete(f"/api/resume/experience/{exp_id}", headers=context["auth"])
+
+async def _create_contacts(client: httpx.AsyncClient, context: dict, count: int) -> None:
+    context["message_ids"] = []
+    for i in range(count):
+        r = await client.post("/api/contact", json=_contact(i))
+        context["message_ids"].append(r.json()["data"]["message_id"])
+    # Give the ingestion queue time to write the batch
+    await asyncio.sleep(0.5)
+
+async def _mark_read(client: httpx.AsyncClient, context: dict, i: int) -> httpx.Response:
+    message_id = context["message_ids"][i % len(context["message_ids"])]
+    return await client.put(f"/api/admin/contact-messages/{message_id}/read", headers=context["auth"])
+
+def _contact(i: int) -> dict:
+    return {
+        "name": f"Visitor {i}",
+        "email": f"visitor{i}@example.com",
+        "subject": "Benchmark message",
+        "message": "Hello from the HTTP benchmark.",
+    }
+
+def _get(path: str, auth: bool = False):
+    async def send(client, context, i):
+        return await client.get(path, headers=context["auth"] if auth else None)
+    return send
+
+SCENARIOS: Dict[str, Scenario] = {
+    # Public resume reads
+    "health": Scenario("reads", _get("/api/")),
+    "resume": Scenario("reads", _get("/api/resume")),
+    "resume_fields": Scenario("reads", _get("/api/resume?fields=personal_info,skills")),
+    "experience": Scenario("reads", _get("/api/resume/experience")),
+    "education": Scenario("reads", _get("/api/resume/education")),
+    # Downloads
+    "pdf": Scenario("downloads", _get("/api/resume/download-pdf")),
+    "markdown": Scenario("downloads", _get("/api/resume/download?format=md")),
+    # Authentication
+    "login": Scenario("auth", lambda c, ctx, i: c.post("/api/auth/login", json=ctx["credentials"])),
+    "verify": Scenario("auth", _get("/api/auth/verify", auth=True)),
+    # Contact form
+    "contact": Scenario("contact", lambda c, ctx, i: c.post("/api/contact", json=_contact(i))),
+    # Admin reads and writes
+    "admin_messages": Scenario("admin", _get("/api/admin/contact-messages?limit=50", auth=True)),
+    "admin_mark_read": Scenario("admin", _mark_read, _create_contacts),
+    "admin_highlights": Scenario("admin", lambda c, ctx, i: c.put(
+        "/api/resume/highlights", json={"highlights": [f"Benchmark highlight {i}"]}, headers=ctx["auth"])),
+    "admin_skills": Scenario("admin", lambda c, ctx, i: c.put(
+        "/api/resume/skills", json={"skills": ["Load testing", f"Skill {i}"]}, headers=ctx["auth"])),
+    "admin_add_experience": Scenario("admin", lambda c, ctx, i: c.post(
+        "/api/resume/experience", json=_experience(i), headers=ctx["auth"])),
+    "admin_delete_experience": Scenario("admin", _delete_experience, _create_experiences),
+}
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_scenario(client: httpx.AsyncClient, context: dict, scenario: Scenario,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    if scenario.setup:
+        await scenario.setup(client, context, requests + warmup)
+    for i in range(warmup):
+        await scenario.send(client, context, i)
+
+    latencies = []
+    statuses = Counter()
+    errors = 0
+    next_index = warmup
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < warmup + requests:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await scenario.send(client, context, i)
+                await response.aread()
+                statuses[response.status_code] += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "transport_errors": errors,
+    }
+
+async def login(client: httpx.AsyncClient, credentials: dict) -> dict:
+    r = await client.post("/api/auth/login", json=credentials)
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+def prepare_in_process_environment() -> None:
+    """Settings that keep the benchmark self-contained and unthrottled"""
+    os.environ.setdefault("STORAGE_BACKEND", "memory")
+    if os.environ["STORAGE_BACKEND"] == "sqlite":
+        os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-db-"), "bench.sqlite3"))
+    os.environ.setdefault("PDF_CACHE_DIR", tempfile.mkdtemp(prefix="bench-pdf-"))
+    # The login throttle would otherwise turn most of a login run into 429s
+    for name in ("LOGIN_IP_LIMIT", "LOGIN_MAX_IN_FLIGHT_PER_IP", "LOGIN_MAX_IN_FLIGHT"):
+        os.environ.setdefault(name, "1000000")
+
+async def run(args) -> list:
+    credentials = {"username": args.username, "password": args.password}
+    results = []
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        app = None
+    else:
+        prepare_in_process_environment()
+        from server import app
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://bench", timeout=args.timeout)
+
+    try:
+        context = {"credentials": credentials, "auth": await login(client, credentials)}
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            for concurrency in args.concurrency:
+                entry = await run_scenario(client, context, scenario, args.requests, concurrency, args.warmup)
+                entry = {"scenario": name, "group": scenario.group, **entry}
+                results.append(entry)
+                latency = entry["latency_ms"]
+                print(f"{name:<24} c={concurrency:<4} {entry['throughput_rps']:>9} req/s  "
+                      f"p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  p99 {latency['p99']:>8} ms  "
+                      f"{entry['status_codes']}")
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(e["scenario"], e["concurrency"]): e for e in baseline["results"]}
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta']['commit']}):")
+    for entry in current["results"]:
+        old = previous.get((entry["scenario"], entry["concurrency"]))
+        if not old:
+            continue
+        before, after = old["latency_ms"]["p95"], entry["latency_ms"]["p95"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  {entry['scenario']:<24} c={entry['concurrency']:<4} "
+              f"{old['throughput_rps']:>9} -> {entry['throughput_rps']:>9} req/s  "
+              f"p95 {before:>8} -> {after:>8} ms ({change:+.1f}%)")
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per scenario and concurrency")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests before each run")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "benchmark": "http",
+            "commit": git_commit(),
+            "target": args.url or f"in-process ({os.environ['STORAGE_BACKEND']} storage)",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "requests": args.requests,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return report
+
+if __name__ == "__main__":
+    main()
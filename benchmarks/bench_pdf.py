@@ -0,0 +1,209 @@
+"""PDF rendering benchmark for ParchmentResumeGenerator.
+
+Builds synthetic resumes shaped like data/mock.py at increasing scale
+factors and renders them through ``render_resume_pdf``, the entry point the
+server uses, timing each stage through its ``on_stage`` hook: every
+section's story building and the ReportLab layout pass.
+Each scale runs in a fresh process, so its peak RSS is its own.
+Results are written as JSON so runs can be compared between commits.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_pdf
+    python -m benchmarks.bench_pdf --scales 1 10 100 --repeat 5 --output before.json
+    python -m benchmarks.bench_pdf --compare before.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import argparse
+import copy
+import json
+import multiprocessing
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import reportlab
+
+from data.mock import resumeData
+from pdf_generator import ParchmentResumeGenerator, render_resume_pdf
+from resume_ir import build_resume_ir
+
+SECTIONS = ("header", "highlights", "experience", "education", "skills")
+# Page objects in the PDF body ("/Type /Pages" is the page tree)
+PAGE_OBJECT = re.compile(rb"/Type\s*/Page\b")
+DEFAULT_SCALES = (1, 2, 5, 10, 25, 50, 100)
+DEFAULT_OUTPUT = ROOT_DIR / "benchmarks" / "results" / "bench_pdf.json"
+
+def synthetic_resume(scale: int) -> dict:
+    """Mock resume with ``scale`` times the experiences, achievements, education and skills"""
+    base_experience = resumeData["experience"]
+    experience = []
+    for i in range(len(base_experience) * scale):
+        exp = copy.deepcopy(base_experience[i % len(base_experience)])
+        exp["id"] = str(i + 1)
+        # Two achievements per entry, so the total grows with the scale too
+        exp["achievements"] = [
+            f"Achievement {i + 1}.{n}: {exp['description'][:120]}" for n in (1, 2)
+        ]
+        experience.append(exp)
+
+    base_education = resumeData["education"]
+    education = []
+    for i in range(len(base_education) * scale):
+        edu = copy.deepcopy(base_education[i % len(base_education)])
+        edu["id"] = str(i + 1)
+        education.append(edu)
+
+    base_skills = resumeData["skills"]
+    skills = [f"{base_skills[i % len(base_skills)]} {i // len(base_skills) + 1}"
+              for i in range(len(base_skills) * scale)]
+
+    return {
+        "personal_info": dict(resumeData["personalInfo"]),
+        "highlights": list(resumeData["highlights"]) * scale,
+        "experience": experience,
+        "education": education,
+        "skills": skills,
+    }
+
+def render_once(resume_ir: dict) -> dict:
+    """One production render, with the time of each stage"""
+    timings = {}
+    started = time.perf_counter()
+    pdf_bytes = render_resume_pdf(resume_ir, on_stage=timings.__setitem__)
+    timings["total"] = time.perf_counter() - started
+    return {"timings": timings, "pages": len(PAGE_OBJECT.findall(pdf_bytes)), "bytes": len(pdf_bytes)}
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(samples: list) -> dict:
+    return {
+        "p50": round(percentile(samples, 50), 6),
+        "p90": round(percentile(samples, 90), 6),
+        "p99": round(percentile(samples, 99), 6),
+        "mean": round(statistics.fmean(samples), 6),
+        "min": round(min(samples), 6),
+        "max": round(max(samples), 6),
+    }
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def bench_scale(scale: int, repeat: int, warmup: int) -> dict:
+    # ru_maxrss only ever grows, so this is the peak before the scale starts
+    rss_before = peak_rss_mib()
+    resume = synthetic_resume(scale)
+    # The server renders the export IR, not the raw document
+    resume_ir = build_resume_ir(resume)
+    for _ in range(warmup):
+        render_once(resume_ir)
+
+    runs = [render_once(resume_ir) for _ in range(repeat)]
+    pages = runs[-1]["pages"]
+    stages = {stage: summarize([run["timings"][stage] for run in runs])
+              for stage in (*SECTIONS, "layout", "total")}
+    total_p50 = stages["total"]["p50"]
+    return {
+        "scale": scale,
+        "counts": {
+            "experience": len(resume["experience"]),
+            "achievements": sum(len(e["achievements"]) for e in resume["experience"]),
+            "education": len(resume["education"]),
+            "skills": len(resume["skills"]),
+            "highlights": len(resume["highlights"]),
+        },
+        "pages": pages,
+        "output_bytes": runs[-1]["bytes"],
+        "pages_per_second": round(pages / total_p50, 2) if total_p50 else None,
+        # Share of the total p50 spent in each stage
+        "share_of_total": {
+            stage: round(stages[stage]["p50"] / total_p50, 4) if total_p50 else None
+            for stage in (*SECTIONS, "layout")
+        },
+        "seconds": stages,
+        "peak_rss_mib": peak_rss_mib(),
+        "rss_increase_mib": round(peak_rss_mib() - rss_before, 1),
+    }
+
+def bench_scale_isolated(scale: int, repeat: int, warmup: int) -> dict:
+    """bench_scale in a fresh interpreter, so peak RSS is not carried over from earlier scales"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(bench_scale, scale, repeat, warmup).result()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    previous = {entry["scale"]: entry for entry in baseline["results"]}
+    print(f"\nCompared with {baseline_path} (commit {baseline['meta']['commit']}):")
+    for entry in current["results"]:
+        old = previous.get(entry["scale"])
+        if not old:
+            continue
+        before, after = old["seconds"]["total"]["p50"], entry["seconds"]["total"]["p50"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"  x{entry['scale']:<4} total p50 {before * 1000:9.1f} ms -> {after * 1000:9.1f} ms ({change:+.1f}%)"
+              f"  size {old['output_bytes']} -> {entry['output_bytes']} bytes")
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="timed renders per scale")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed renders per scale")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scales:
+        entry = bench_scale_isolated(scale, args.repeat, args.warmup)
+        results.append(entry)
+        total = entry["seconds"]["total"]
+        print(f"x{scale:<4} {entry['counts']['experience']:>5} exp {entry['pages']:>5} pages "
+              f"p50 {total['p50'] * 1000:9.1f} ms  p99 {total['p99'] * 1000:9.1f} ms  "
+              f"{entry['pages_per_second']:>8} pages/s  {entry['output_bytes'] / 1024:9.1f} KiB  "
+              f"rss {entry['peak_rss_mib']} MiB (+{entry['rss_increase_mib']})")
+
+    report = {
+        "meta": {
+            "benchmark": "pdf_render",
+            "commit": git_commit(),
+            "generator_version": ParchmentResumeGenerator.GENERATOR_VERSION,
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+    return report
+
+if __name__ == "__main__":
+    main()
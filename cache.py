@@ -0,0 +1,254 @@
+from collections import deque, OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Deque, FrozenSet, Iterator, List, Optional, Set, Tuple
+import copy
+import os
+import time
+
+class ResumeDelta:
+    """One change written to the active resume, replayable on a cached copy.
+
+    ``kind`` mirrors the update operator that was sent: ``set`` replaces the
+    top-level ``field``, ``merge`` sets keys inside it (dot-path $set),
+    ``push`` appends an entry, ``update_item`` merges into the entry whose
+    ``id`` is ``item_id`` (positional $set) and ``pull`` removes the entries
+    with that id.
+    """
+
+    __slots__ = ("kind", "field", "value", "item_id")
+
+    KINDS = ("set", "merge", "push", "update_item", "pull")
+
+    def __init__(self, kind: str, field: str, value=None, item_id: Optional[str] = None):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown delta kind {kind}")
+        self.kind = kind
+        self.field = field
+        self.value = value
+        self.item_id = item_id
+
+    def apply(self, resume: dict) -> bool:
+        """Apply to ``resume`` in place; False if it does not fit the document"""
+        if self.kind == "set":
+            resume[self.field] = copy.deepcopy(self.value)
+        elif self.kind == "merge":
+            resume.setdefault(self.field, {}).update(copy.deepcopy(self.value))
+        elif self.kind == "push":
+            resume.setdefault(self.field, []).append(copy.deepcopy(self.value))
+        elif self.kind == "update_item":
+            # Like the positional $ operator: the first entry with this id
+            entry = next((e for e in resume.get(self.field, []) if e.get("id") == self.item_id), None)
+            if entry is None:
+                return False
+            entry.update(copy.deepcopy(self.value))
+        else:
+            resume[self.field] = [e for e in resume.get(self.field, []) if e.get("id") != self.item_id]
+        return True
+
+class ResumeWrite:
+    """Tracks one in-flight write; overlapping writes may land in either order"""
+
+    __slots__ = ("overlapped",)
+
+    def __init__(self):
+        self.overlapped = False
+
+class ResumeCache:
+    """In-process cache of the active resume document.
+
+    Every successful write through ResumeDatabase either patches the cached
+    copy with the write's deltas or invalidates it, and bumps ``version`` so
+    anything derived from the document (serialized bodies, rendered PDFs) can
+    tell it is out of date. ``changed_since`` tells derived caches which
+    top-level fields changed, so they only rebuild those.
+    """
+
+    def __init__(self, history: int = 32):
+        self._resume: Optional[dict] = None
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.patches = 0
+        # (version, fields changed to reach it); None means "unknown, rebuild everything"
+        self._changes: Deque[Tuple[int, Optional[FrozenSet[str]]]] = deque(maxlen=history)
+        self._writes: Set[ResumeWrite] = set()
+        # Called after local invalidations, e.g. to tell other workers
+        self.listeners: List[Callable[[], None]] = []
+
+    def get(self) -> Optional[dict]:
+        """Return the cached resume, counting the lookup as a hit or a miss"""
+        if self._resume is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._resume
+
+    def set(self, resume: dict, version: Optional[int] = None) -> None:
+        """Store a freshly loaded resume document.
+
+        ``version`` is the value of ``self.version`` captured before the load
+        started; if a write has invalidated the cache in the meantime the
+        (possibly stale) document is discarded instead of being cached.
+        """
+        if version is not None and version != self.version:
+            return
+        self._resume = resume
+
+    def invalidate(self, broadcast: bool = True) -> None:
+        """Drop the cached resume and move to a new version.
+
+        ``broadcast=False`` is for invalidations that came from another
+        worker, so they are not echoed back to the listeners.
+        """
+        self._resume = None
+        self.version += 1
+        self._changes.append((self.version, None))
+        if broadcast:
+            for listener in self.listeners:
+                listener()
+
+    @contextmanager
+    def writing(self) -> Iterator[ResumeWrite]:
+        """Wrap a database write whose deltas will be passed to ``apply``"""
+        write = ResumeWrite()
+        if self._writes:
+            # Concurrent writes may complete in a different order than the
+            # database applied them, so none of them can be replayed safely
+            write.overlapped = True
+            for other in self._writes:
+                other.overlapped = True
+        self._writes.add(write)
+        try:
+            yield write
+        finally:
+            self._writes.discard(write)
+
+    def apply(self, write: ResumeWrite, deltas: List[ResumeDelta], updated_at: datetime, version: int) -> None:
+        """Patch the cached resume with a successful write, or invalidate it.
+
+        ``version`` is the document version the write produced; unless it
+        directly follows the cached one, some other write landed in between
+        and the cached copy cannot be patched.
+        """
+        if (self._resume is None or write.overlapped
+                or self._resume.get("version", 0) + 1 != version):
+            self.invalidate()
+            return
+        fields = {delta.field for delta in deltas}
+        resume = dict(self._resume)
+        for field in fields:
+            # Copy what is about to change; snapshots may still hold the old values
+            if field in resume:
+                resume[field] = copy.deepcopy(resume[field])
+        if not all(delta.apply(resume) for delta in deltas):
+            self.invalidate()
+            return
+        resume["updated_at"] = updated_at
+        resume["version"] = version
+        self._resume = resume
+        self.version += 1
+        self._changes.append((self.version, frozenset(fields | {"updated_at", "version"})))
+        self.patches += 1
+        for listener in self.listeners:
+            listener()
+
+    def changed_since(self, version: int) -> Optional[Set[str]]:
+        """Top-level fields changed after ``version``, or None if unknown"""
+        fields: Set[str] = set()
+        expected = version + 1
+        for changed_version, changed in self._changes:
+            if changed_version < expected:
+                continue
+            if changed_version != expected or changed is None:
+                return None
+            fields |= changed
+            expected += 1
+        return fields if expected == self.version + 1 else None
+
+    def is_current(self, version: int) -> bool:
+        """Whether the cached copy already reflects the write that produced ``version``"""
+        return self._resume is not None and self._resume.get("version", 0) >= version
+
+    @property
+    def is_warm(self) -> bool:
+        return self._resume is not None
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "patches": self.patches,
+            "warm": self.is_warm,
+        }
+
+class PrincipalCache:
+    """Bounded TTL cache of verified token -> user document.
+
+    Entries never outlive the token's own ``exp`` and are dropped as soon as
+    the user they belong to is changed.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Called with the username after local invalidations
+        self.listeners: List[Callable[[str], None]] = []
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return dict(user)
+
+    def set(self, token: str, user: dict, token_exp: Optional[float] = None) -> None:
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        self._entries[token] = (expires_at, dict(user))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str, broadcast: bool = True) -> None:
+        """Forget every cached token belonging to ``username``"""
+        stale = [token for token, (_, user) in self._entries.items() if user.get("username") == username]
+        for token in stale:
+            del self._entries[token]
+        if broadcast:
+            for listener in self.listeners:
+                listener(username)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+# Global cache instances
+resume_cache = ResumeCache()
+principal_cache = PrincipalCache(
+    ttl=float(os.environ.get("PRINCIPAL_CACHE_TTL", "300")),
+    max_entries=int(os.environ.get("PRINCIPAL_CACHE_SIZE", "1024")),
+)
@@ -0,0 +1,217 @@
+from bson import ObjectId, json_util
+from datetime import datetime
+from pathlib import Path
+from pymongo.errors import BulkWriteError
+from typing import List, Optional
+import asyncio
+import logging
+import os
+
+from database import ContactDatabase
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error (a spooled message that had already been written)
+DUPLICATE_KEY = 11000
+
+# Queue sentinel asking the worker to flush and exit
+_STOP = None
+
+class IngestQueueFull(Exception):
+    """Raised when the contact queue has no room for another message"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Contact ingestion queue is full")
+        self.retry_after = retry_after
+
+class ContactIngestQueue:
+    """Buffers contact form submissions and writes them with insert_many.
+
+    Messages get their ``_id`` when they are accepted, so the form can answer
+    right away. A worker writes them when ``batch_size`` messages are waiting
+    or ``flush_interval`` seconds have passed. The queue holds at most
+    ``max_size`` messages; past that, ``submit`` raises ``IngestQueueFull``.
+    If ``spool_path`` is set, batches that fail to write are appended to
+    that file and replayed once MongoDB is reachable again.
+    """
+
+    def __init__(self, max_size: int = 1000, batch_size: int = 50, flush_interval: float = 0.2,
+                 spool_path: Optional[str] = None, retry_interval: float = 5.0):
+        self.max_size = max_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.retry_interval = retry_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.written = 0
+        self.batches = 0
+        self.spooled = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        await self.replay_spool()
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._worker_done)
+
+    def _worker_done(self, task: asyncio.Task) -> None:
+        # _run only returns on stop(); anything else means submissions are no longer written
+        if task.cancelled():
+            logger.error("Contact ingest worker was cancelled")
+        elif task.exception() is not None:
+            logger.error(f"Contact ingest worker died: {str(task.exception())}")
+
+    def submit(self, message: dict) -> str:
+        """Accept a message for writing and return its id"""
+        message["_id"] = ObjectId()
+        message["created_at"] = datetime.utcnow()
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise IngestQueueFull(max(1, int(self.flush_interval) + 1))
+        self.accepted += 1
+        return str(message["_id"])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self.retry_interval)
+            except asyncio.TimeoutError:
+                # Quiet period: a good time to retry anything left in the spool
+                if self._spool_has_data():
+                    await self.replay_spool()
+                continue
+
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if message is _STOP:
+                    stopping = True
+                    break
+                batch.append(message)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[dict]) -> None:
+        try:
+            await ContactDatabase.save_contact_messages(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Not only PyMongoError: e.g. bson's InvalidDocument. The messages
+            # were already acknowledged, and the worker must keep running
+            logger.error(f"Error writing {len(batch)} contact messages: {str(e)}")
+            self._spool(batch)
+
+    def _spool(self, batch: List[dict]) -> None:
+        if not self.spool_path:
+            logger.error(f"No contact spool configured, dropped {len(batch)} messages")
+            return
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for message in batch:
+                    f.write(json_util.dumps(message) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.spooled += len(batch)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Could not spool {len(batch)} contact messages: {str(e)}")
+
+    def _spool_has_data(self) -> bool:
+        try:
+            return bool(self.spool_path) and self.spool_path.stat().st_size > 0
+        except FileNotFoundError:
+            return False
+
+    async def replay_spool(self) -> None:
+        """Write spooled messages back to MongoDB, keeping the spool if that fails"""
+        if not self._spool_has_data():
+            return
+        messages = []
+        try:
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        messages.append(json_util.loads(line, json_options=json_util.JSONOptions(tz_aware=False)))
+                    except ValueError:
+                        logger.error("Skipping corrupt line in contact spool")
+        except OSError as e:
+            logger.error(f"Could not read contact spool: {str(e)}")
+            return
+        try:
+            if messages:
+                await ContactDatabase.save_contact_messages(messages)
+        except BulkWriteError as e:
+            # Messages written before an earlier failure come back as duplicates
+            if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                logger.error(f"Error replaying contact spool: {str(e)}")
+                return
+        except Exception as e:
+            logger.error(f"Error replaying contact spool: {str(e)}")
+            return
+        try:
+            self.spool_path.write_text("", encoding="utf-8")
+        except OSError as e:
+            # Replayed again later; the duplicates are skipped
+            logger.error(f"Could not truncate contact spool: {str(e)}")
+        self.written += len(messages)
+        logger.info(f"Replayed {len(messages)} spooled contact messages")
+
+    async def stop(self) -> None:
+        """Stop the worker and flush everything still queued"""
+        if self.running:
+            # The worker writes its current batch before honouring the sentinel
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        if self._queue is None:
+            return
+        pending = []
+        while not self._queue.empty():
+            message = self._queue.get_nowait()
+            if message is not _STOP:
+                pending.append(message)
+        for start in range(0, len(pending), self.batch_size):
+            await self._write(pending[start:start + self.batch_size])
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "accepted": self.accepted,
+            "written": self.written,
+            "batches": self.batches,
+            "spooled": self.spooled,
+            "rejected": self.rejected,
+        }
+
+# Global contact ingestion queue
+contact_ingest = ContactIngestQueue(
+    max_size=int(os.environ.get("CONTACT_QUEUE_SIZE", "1000")),
+    batch_size=int(os.environ.get("CONTACT_BATCH_SIZE", "50")),
+    flush_interval=float(os.environ.get("CONTACT_FLUSH_INTERVAL", "0.2")),
+    spool_path=os.environ.get("CONTACT_SPOOL_PATH") or None,
+)
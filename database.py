@@ -1,186 +1,656 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo import monitoring, ReturnDocument
+from pymongo.errors import PyMongoError, DuplicateKeyError
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import base64
+import json
+import logging
 import os
+from pathlib import Path
+import threading
+import time
 from models import Experience, Education, ContactMessage, User
 from datetime import datetime
+from cache import ResumeDelta, resume_cache, principal_cache
+from singleflight import single_flight
+from storage import EmbeddedDatabase, MemoryDatabase, SqliteDatabase
+from metrics import instrument_db, db_pool_wait
 
-# Database configuration
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'resume_db')]
+# Client, database and collections; bound by db_manager.connect() at startup
+client: Optional[AsyncIOMotorClient] = None
+db = None
+resumes_collection = None
+contacts_collection = None
+users_collection = None
 
-# Collections
-resumes_collection = db.resumes
-contacts_collection = db.contact_messages
-users_collection = db.users
+logger = logging.getLogger(__name__)
 
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's CMAP events.
+
+    Check-out start and finish are reported on the same (executor) thread,
+    so the wait for a connection is measured with a thread-local timestamp.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.in_use = 0
+        self.pool_clears = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        db_pool_wait.observe(wait)
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.created - self.closed,
+                "in_use": self.in_use,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+# Storage backends selectable with STORAGE_BACKEND
+STORAGE_BACKENDS = ("mongo", "sqlite", "memory")
+
+class DatabaseManager:
+    """Owns the storage connection: created at startup, warmed, probed and closed.
+
+    STORAGE_BACKEND picks MongoDB through Motor (``mongo``, the default), a
+    local SQLite file (``sqlite``, at SQLITE_PATH) or process memory
+    (``memory``, for tests and benchmarks). The embedded backends expose the
+    same collection API, so the database classes below work unchanged.
+
+    Settings are read from the environment when ``connect()`` runs (after
+    .env has been loaded): MONGO_URL, DB_NAME, MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_COMPRESSORS (e.g. "zstd,zlib")
+    and MONGO_WARM_CONNECTIONS.
+    """
+
+    def __init__(self):
+        self.pool_monitor = PoolMonitor()
+        self.backend: Optional[str] = None
+        self.ready = False
+        self.warm_connections = 0
+        self.last_ping_ms: Optional[float] = None
+
+    @staticmethod
+    def client_options() -> dict:
+        options = {
+            "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE"),
+            "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE"),
+            "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS"),
+            "waitQueueTimeoutMS": _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+            "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS"),
+            "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS"),
+            "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+            "compressors": os.environ.get("MONGO_COMPRESSORS") or None,
+        }
+        # Unset options keep the driver defaults
+        return {k: v for k, v in options.items() if v is not None}
+
+    def connect(self) -> None:
+        """Create the client and bind the module-level collections"""
+        global client
+        if db is not None:
+            return
+        backend = os.environ.get("STORAGE_BACKEND", "mongo").lower()
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"STORAGE_BACKEND must be one of: {', '.join(STORAGE_BACKENDS)}")
+        self.backend = backend
+        if backend == "memory":
+            self.bind(MemoryDatabase())
+        elif backend == "sqlite":
+            self.bind(SqliteDatabase(os.environ.get("SQLITE_PATH") or str(Path(__file__).parent / "resume.sqlite3")))
+        else:
+            client = AsyncIOMotorClient(
+                os.environ.get("MONGO_URL"),
+                event_listeners=[self.pool_monitor],
+                **self.client_options()
+            )
+            self.bind(client[os.environ.get("DB_NAME", "resume_db")])
+
+    @staticmethod
+    def bind(database) -> None:
+        """Point the module-level collections at ``database``"""
+        global db, resumes_collection, contacts_collection, users_collection
+        db = database
+        resumes_collection = db.resumes
+        contacts_collection = db.contact_messages
+        users_collection = db.users
+
+    async def ping(self, timeout: float = 2.0) -> float:
+        """Round-trip a ping and return its latency in milliseconds"""
+        started = time.perf_counter()
+        await asyncio.wait_for(db.command("ping"), timeout)
+        self.last_ping_ms = round((time.perf_counter() - started) * 1000, 3)
+        return self.last_ping_ms
+
+    async def warm_up(self) -> None:
+        """Open connections before serving traffic so the first users don't pay for them"""
+        count = int(os.environ.get("MONGO_WARM_CONNECTIONS") or
+                    max(self.client_options().get("minPoolSize", 0), 4)) if client is not None else 1
+        try:
+            # Concurrent pings each need their own connection
+            await asyncio.gather(*(db.command("ping") for _ in range(count)))
+            self.warm_connections = count
+            self.ready = True
+        except PyMongoError as e:
+            logger.error(f"Could not warm up the MongoDB connection pool: {str(e)}")
+
+    async def check_ready(self) -> bool:
+        """Readiness probe: connected, warmed up and answering pings"""
+        if db is None:
+            return False
+        try:
+            await self.ping()
+        except (PyMongoError, asyncio.TimeoutError):
+            return False
+        self.ready = True
+        return True
+
+    def close(self) -> None:
+        """Close the client's connections (on shutdown)"""
+        global client, db, resumes_collection, contacts_collection, users_collection
+        self.ready = False
+        if client is not None:
+            client.close()
+            client = None
+        elif isinstance(db, EmbeddedDatabase):
+            db.close()
+        db = resumes_collection = contacts_collection = users_collection = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "connected": db is not None,
+            "ready": self.ready,
+            "warm_connections": self.warm_connections,
+            "last_ping_ms": self.last_ping_ms,
+            "options": self.client_options(),
+            "pool": self.pool_monitor.stats(),
+        }
+
+# Global database lifecycle manager
+db_manager = DatabaseManager()
+
+# Indexes backing every query in this module: (keys, options) per collection
+INDEX_SPECS = {
+    "resumes": [
+        # At most one active resume; also serves every {"active": True} lookup
+        ([("active", 1)], {"name": "active_unique", "unique": True,
+                           "partialFilterExpression": {"active": True}}),
+        ([("experience.id", 1)], {"name": "experience_id"}),
+        ([("education.id", 1)], {"name": "education_id"}),
+    ],
+    "users": [
+        ([("username", 1)], {"name": "username_unique", "unique": True}),
+    ],
+    "contact_messages": [
+        ([("created_at", -1), ("_id", -1)], {"name": "created_at_id"}),
+        ([("status", 1), ("created_at", -1)], {"name": "status_created_at"}),
+    ],
+}
+
+def _collections() -> dict:
+    return {
+        "resumes": resumes_collection,
+        "users": users_collection,
+        "contact_messages": contacts_collection,
+    }
+
+async def ensure_indexes() -> dict:
+    """Create the indexes in INDEX_SPECS (idempotent; safe on every startup)"""
+    report = {}
+    for name, collection in _collections().items():
+        created = []
+        for keys, options in INDEX_SPECS[name]:
+            try:
+                created.append(await collection.create_index(keys, **options))
+            except PyMongoError as e:
+                # e.g. duplicate usernames or active resumes already in the data
+                logger.warning(f"Could not create index {options['name']} on {name}: {str(e)}")
+        report[name] = created
+    return report
+
+async def index_usage_report() -> dict:
+    """Per-index access counters from $indexStats"""
+    report = {}
+    for name, collection in _collections().items():
+        stats = []
+        async for entry in collection.aggregate([{"$indexStats": {}}]):
+            accesses = entry.get("accesses", {})
+            stats.append({
+                "name": entry.get("name"),
+                "key": dict(entry.get("key", {})),
+                "ops": accesses.get("ops", 0),
+                "since": accesses.get("since"),
+            })
+        report[name] = stats
+    return report
+
+class ResumeConflictError(Exception):
+    """A guarded write lost a race with another writer"""
+
+class ResumeVersionMismatch(ResumeConflictError):
+    """The resume is no longer at the version the client asked to change (If-Match)"""
+
+    def __init__(self, current: dict):
+        super().__init__(f"Resume is at version {current.get('version')}")
+        # _id and version of the resume as it is now
+        self.current = current
+
+def _now() -> datetime:
+    """Current UTC time at the millisecond precision MongoDB stores"""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+# get_resume and friends are mostly cache hits; time only the calls that reach MongoDB
+@instrument_db("_load_resume", "_load_fields", "_write", "apply_batch")
 class ResumeDatabase:
     
     @staticmethod
     async def get_resume() -> Optional[dict]:
-        """Get the main resume document"""
+        """Get the main resume document (served from the in-process cache when warm)"""
+        resume = resume_cache.get()
+        if resume is None:
+            # Concurrent misses share a single fetch (and bootstrap). The key
+            # carries the cache version so a miss after a write never joins a
+            # load that started before it
+            resume = await single_flight.do(("resume", resume_cache.version), ResumeDatabase._load_resume)
+        return dict(resume) if resume else None
+    
+    @staticmethod
+    async def _load_resume() -> Optional[dict]:
+        """Fetch the active resume from MongoDB, creating it on first run"""
+        version = resume_cache.version
         resume = await resumes_collection.find_one({"active": True})
         if not resume:
             # Create default resume if none exists
             await ResumeDatabase.create_default_resume()
+            version = resume_cache.version
             resume = await resumes_collection.find_one({"active": True})
+        if resume:
+            resume_cache.set(resume, version)
         return resume
     
+    @staticmethod
+    async def get_resume_fields(fields: list) -> Optional[dict]:
+        """Get selected top-level fields of the resume.
+
+        Uses the cached document when it is warm; otherwise asks MongoDB for
+        just those fields instead of the whole document.
+        """
+        resume = resume_cache.get()
+        if resume is None:
+            resume = await ResumeDatabase._load_fields(fields)
+            if resume is None:
+                # No active resume yet; fall back to the bootstrap path
+                resume = await ResumeDatabase.get_resume()
+        if resume is None:
+            return None
+        return {field: resume[field] for field in fields if field in resume}
+    
+    @staticmethod
+    async def _load_fields(fields: list) -> Optional[dict]:
+        """Fetch only ``fields`` of the active resume"""
+        projection = {field: 1 for field in fields}
+        projection["_id"] = 0
+        return await resumes_collection.find_one({"active": True}, projection)
+    
     @staticmethod
     async def create_default_resume():
         """Create default resume from mock data"""
         from data.mock import resumeData
         
         default_resume = {
-            "active": True,
             "personal_info": resumeData["personalInfo"],
             "highlights": resumeData["highlights"],
             "experience": resumeData["experience"],
             "education": resumeData["education"],
             "skills": resumeData["skills"],
             "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "updated_at": datetime.utcnow(),
+            "version": 1
         }
         
-        await resumes_collection.insert_one(default_resume)
+        # Upsert so racing bootstraps (other requests or workers) can't create
+        # two active resumes; the partial unique index on "active" backs this up
+        try:
+            await resumes_collection.update_one(
+                {"active": True},
+                {"$setOnInsert": default_resume},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass
+        resume_cache.invalidate()
+    
+    @staticmethod
+    async def _write(query: dict, update: dict, now: datetime, if_match: Optional[List[Tuple[int, str]]],
+                     *deltas: ResumeDelta) -> Optional[dict]:
+        """Apply one update to the active resume and bump its version.
+
+        Returns the written resume's ``_id`` and new ``version``, or None when
+        nothing matched ``query``. With ``if_match`` ((version, _id) pairs)
+        the write only applies while the resume is one of those, otherwise
+        ResumeVersionMismatch is raised.
+        """
+        query = {"active": True, **query}
+        if if_match:
+            query["$or"] = [{"_id": ObjectId(resume_id), "version": version} for version, resume_id in if_match]
+        update = {**update, "$inc": {"version": 1}}
+        updated = None
+        if if_match != []:
+            with resume_cache.writing() as write:
+                # Unlike modified_count, the returned document tells "not found"
+                # apart from a write that left the values as they were
+                updated = await resumes_collection.find_one_and_update(
+                    query, update, projection={"version": 1},
+                    return_document=ReturnDocument.AFTER
+                )
+                if updated is not None:
+                    resume_cache.apply(write, list(deltas), now, updated["version"])
+                    return updated
+        if if_match is not None:
+            current = await resumes_collection.find_one({"active": True}, {"version": 1})
+            if current is not None and (current.get("version"), str(current["_id"])) not in if_match:
+                raise ResumeVersionMismatch(current)
+        return None
     
     @staticmethod
-    async def update_personal_info(personal_info: dict) -> bool:
+    async def update_personal_info(personal_info: dict, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Update personal information"""
         # Create update fields with dot notation to merge instead of replace
         update_fields = {}
         for key, value in personal_info.items():
             update_fields[f"personal_info.{key}"] = value
         
-        update_fields["updated_at"] = datetime.utcnow()
+        now = _now()
+        update_fields["updated_at"] = now
         
-        result = await resumes_collection.update_one(
-            {"active": True},
-            {"$set": update_fields}
+        return await ResumeDatabase._write(
+            {}, {"$set": update_fields}, now, if_match,
+            ResumeDelta("merge", "personal_info", personal_info)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def update_highlights(highlights: list) -> bool:
+    async def update_highlights(highlights: list, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Update professional highlights"""
-        result = await resumes_collection.update_one(
-            {"active": True},
+        now = _now()
+        return await ResumeDatabase._write(
+            {},
             {
                 "$set": {
                     "highlights": highlights,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
-            }
+            },
+            now, if_match, ResumeDelta("set", "highlights", highlights)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def update_skills(skills: list) -> bool:
+    async def update_skills(skills: list, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Update skills list"""
-        result = await resumes_collection.update_one(
-            {"active": True},
+        now = _now()
+        return await ResumeDatabase._write(
+            {},
             {
                 "$set": {
                     "skills": skills,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
-            }
+            },
+            now, if_match, ResumeDelta("set", "skills", skills)
         )
-        return result.modified_count > 0
     
     @staticmethod
     async def get_experiences() -> list:
         """Get all work experiences"""
-        resume = await ResumeDatabase.get_resume()
+        resume = await ResumeDatabase.get_resume_fields(["experience"])
         return resume.get("experience", []) if resume else []
     
     @staticmethod
-    async def add_experience(experience: dict) -> bool:
+    async def add_experience(experience: dict, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Add new work experience"""
-        experience["created_at"] = datetime.utcnow()
-        experience["updated_at"] = datetime.utcnow()
+        now = _now()
+        experience["created_at"] = now
+        experience["updated_at"] = now
         
-        result = await resumes_collection.update_one(
-            {"active": True},
+        return await ResumeDatabase._write(
+            {},
             {
                 "$push": {"experience": experience},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$set": {"updated_at": now}
+            },
+            now, if_match, ResumeDelta("push", "experience", experience)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def update_experience(exp_id: str, experience: dict) -> bool:
+    async def update_experience(exp_id: str, experience: dict, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Update existing work experience"""
-        experience["updated_at"] = datetime.utcnow()
+        now = _now()
+        experience["updated_at"] = now
         
-        result = await resumes_collection.update_one(
-            {"active": True, "experience.id": exp_id},
+        return await ResumeDatabase._write(
+            {"experience.id": exp_id},
             {
                 "$set": {
                     **{f"experience.$.{k}": v for k, v in experience.items()},
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
-            }
+            },
+            now, if_match, ResumeDelta("update_item", "experience", experience, exp_id)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def delete_experience(exp_id: str) -> bool:
+    async def delete_experience(exp_id: str, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Remove work experience"""
-        result = await resumes_collection.update_one(
-            {"active": True},
+        now = _now()
+        # Matching on the id keeps "not found" from bumping the version
+        return await ResumeDatabase._write(
+            {"experience.id": exp_id},
             {
                 "$pull": {"experience": {"id": exp_id}},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$set": {"updated_at": now}
+            },
+            now, if_match, ResumeDelta("pull", "experience", item_id=exp_id)
         )
-        return result.modified_count > 0
     
     @staticmethod
     async def get_education() -> list:
         """Get all education entries"""
-        resume = await ResumeDatabase.get_resume()
+        resume = await ResumeDatabase.get_resume_fields(["education"])
         return resume.get("education", []) if resume else []
     
     @staticmethod
-    async def add_education(education: dict) -> bool:
+    async def add_education(education: dict, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Add new education entry"""
-        result = await resumes_collection.update_one(
-            {"active": True},
+        now = _now()
+        return await ResumeDatabase._write(
+            {},
             {
                 "$push": {"education": education},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$set": {"updated_at": now}
+            },
+            now, if_match, ResumeDelta("push", "education", education)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def update_education(edu_id: str, education: dict) -> bool:
+    async def update_education(edu_id: str, education: dict, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Update existing education entry"""
-        result = await resumes_collection.update_one(
-            {"active": True, "education.id": edu_id},
+        now = _now()
+        return await ResumeDatabase._write(
+            {"education.id": edu_id},
             {
                 "$set": {
                     **{f"education.$.{k}": v for k, v in education.items()},
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
-            }
+            },
+            now, if_match, ResumeDelta("update_item", "education", education, edu_id)
         )
-        return result.modified_count > 0
     
     @staticmethod
-    async def delete_education(edu_id: str) -> bool:
+    async def delete_education(edu_id: str, if_match: Optional[List[Tuple[int, str]]] = None) -> Optional[dict]:
         """Remove education entry"""
-        result = await resumes_collection.update_one(
-            {"active": True},
+        now = _now()
+        return await ResumeDatabase._write(
+            {"education.id": edu_id},
             {
                 "$pull": {"education": {"id": edu_id}},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$set": {"updated_at": now}
+            },
+            now, if_match, ResumeDelta("pull", "education", item_id=edu_id)
         )
-        return result.modified_count > 0
 
+    @staticmethod
+    def _apply_operation(resume: dict, op: str, item_id: Optional[str], data: Optional[dict], now: datetime) -> Optional[str]:
+        """Apply one batch operation to an in-memory resume; returns an error message on failure"""
+        if op == "update_personal_info":
+            resume.setdefault("personal_info", {}).update(data)
+        elif op == "set_highlights":
+            resume["highlights"] = data["highlights"]
+        elif op == "set_skills":
+            resume["skills"] = data["skills"]
+        elif op in ("add_experience", "add_education"):
+            section = "experience" if op == "add_experience" else "education"
+            if section == "experience":
+                # Same stamps as add_experience, at the precision the store keeps
+                data = {**data, "created_at": now, "updated_at": now}
+            resume.setdefault(section, []).append(data)
+        elif op in ("update_experience", "update_education"):
+            section = "experience" if op == "update_experience" else "education"
+            # Same semantics as the positional $ update: first entry with this id
+            entry = next((e for e in resume.get(section, []) if e.get("id") == item_id), None)
+            if entry is None:
+                return f"{section.capitalize()} not found"
+            entry.update(data)
+            if section == "experience":
+                entry["updated_at"] = now
+        elif op in ("delete_experience", "delete_education"):
+            section = "experience" if op == "delete_experience" else "education"
+            entries = resume.get(section, [])
+            remaining = [e for e in entries if e.get("id") != item_id]
+            if len(remaining) == len(entries):
+                return f"{section.capitalize()} not found"
+            resume[section] = remaining
+        else:
+            return f"Unsupported operation {op}"
+        return None
+    
+    @staticmethod
+    async def apply_batch(operations: list, attempts: int = 3,
+                          if_match: Optional[List[Tuple[int, str]]] = None) -> Tuple[Optional[dict], list]:
+        """Apply a list of {op, id, data} operations atomically in one update.
+
+        The operations are replayed against the current document in memory and
+        the touched sections are written back with a single update, guarded
+        on the version so a concurrent write makes us re-read and retry instead
+        of being overwritten. Nothing is written unless every operation applies.
+        Returns the written _id and version (None if nothing was written) and the results.
+        """
+        touched_by_op = {
+            "update_personal_info": "personal_info",
+            "set_highlights": "highlights",
+            "set_skills": "skills",
+        }
+        for _ in range(attempts):
+            resume = await resumes_collection.find_one({"active": True})
+            if not resume:
+                return None, [{"index": i, "op": o["op"], "success": False, "error": "Resume not found"}
+                              for i, o in enumerate(operations)]
+            if if_match is not None and (resume.get("version"), str(resume["_id"])) not in if_match:
+                raise ResumeVersionMismatch(resume)
+            
+            now = _now()
+            touched = set()
+            results = []
+            for index, operation in enumerate(operations):
+                op = operation["op"]
+                error = ResumeDatabase._apply_operation(resume, op, operation.get("id"), operation.get("data"), now)
+                item_id = operation.get("id") or (operation.get("data") or {}).get("id")
+                results.append({"index": index, "op": op, "success": error is None, "id": item_id, "error": error})
+                touched.add(touched_by_op.get(op) or op.split("_", 1)[1])
+            
+            if not all(r["success"] for r in results):
+                return None, results
+            
+            update_fields = {section: resume.get(section) for section in touched}
+            update_fields["updated_at"] = now
+            written = await ResumeDatabase._write(
+                {"version": resume.get("version")}, {"$set": update_fields}, now, None,
+                *(ResumeDelta("set", section, resume.get(section)) for section in touched)
+            )
+            if written is not None:
+                return written, results
+        raise ResumeConflictError("Resume changed concurrently, batch not applied")
+
+# Upper bound for a single page of contact messages
+MAX_CONTACT_PAGE_SIZE = 200
+
+@instrument_db()
 class ContactDatabase:
     
     @staticmethod
@@ -191,14 +661,95 @@ class ContactDatabase:
         return str(result.inserted_id)
     
     @staticmethod
-    async def get_contact_messages(limit: int = 50) -> list:
-        """Get recent contact messages"""
-        cursor = contacts_collection.find().sort("created_at", -1).limit(limit)
-        messages = []
-        async for doc in cursor:
+    async def save_contact_messages(messages: list) -> list:
+        """Save a batch of contact form messages in one round trip"""
+        result = await contacts_collection.insert_many(messages, ordered=False)
+        return [str(inserted_id) for inserted_id in result.inserted_ids]
+    
+    @staticmethod
+    def encode_cursor(doc: dict) -> str:
+        """Opaque keyset cursor pointing just past ``doc`` in (created_at, _id) order"""
+        created_at = doc.get("created_at")
+        raw = json.dumps({
+            "c": created_at.isoformat() if created_at else None,
+            "i": str(doc["_id"])
+        })
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+        """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            created_at = datetime.fromisoformat(data["c"]) if data["c"] else None
+            return created_at, ObjectId(data["i"])
+        except (ValueError, KeyError, TypeError, InvalidId) as e:
+            raise ValueError("Invalid cursor") from e
+    
+    @staticmethod
+    def _messages_query(status: Optional[str] = None, cursor: Optional[str] = None) -> dict:
+        query = {}
+        if status:
+            query["status"] = status
+        if cursor:
+            created_at, last_id = ContactDatabase.decode_cursor(cursor)
+            # Strictly after the cursor in (created_at desc, _id desc) order
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": last_id}}
+            ]
+        return query
+    
+    @staticmethod
+    async def get_contact_messages(
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        include_body: bool = True
+    ) -> Tuple[list, Optional[str]]:
+        """Get one page of contact messages, newest first, plus the cursor for the next page"""
+        limit = max(1, min(limit, MAX_CONTACT_PAGE_SIZE))
+        projection = None if include_body else {"message": 0}
+        
+        # Fetch one extra document to learn whether another page exists
+        docs = await contacts_collection.find(
+            ContactDatabase._messages_query(status, cursor), projection
+        ).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = ContactDatabase.encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        messages = docs[:limit]
+        for doc in messages:
+            doc["_id"] = str(doc["_id"])
+        return messages, next_cursor
+    
+    @staticmethod
+    async def iter_contact_messages(
+        status: Optional[str] = None,
+        include_body: bool = True,
+        batch_size: int = MAX_CONTACT_PAGE_SIZE
+    ) -> AsyncIterator[dict]:
+        """Yield every matching message, newest first, one bounded page at a time"""
+        cursor = None
+        while True:
+            messages, cursor = await ContactDatabase.get_contact_messages(
+                batch_size, cursor, status, include_body
+            )
+            for message in messages:
+                yield message
+            if not cursor:
+                break
+    
+    @staticmethod
+    async def get_contact_message(message_id: str) -> Optional[dict]:
+        """Get a single contact message including its body"""
+        try:
+            doc = await contacts_collection.find_one({"_id": ObjectId(message_id)})
+        except InvalidId:
+            return None
+        if doc:
             doc["_id"] = str(doc["_id"])
-            messages.append(doc)
-        return messages
+        return doc
     
     @staticmethod
     async def mark_message_as_read(message_id: str) -> bool:
@@ -210,6 +761,7 @@ class ContactDatabase:
         )
         return result.modified_count > 0
 
+@instrument_db()
 class UserDatabase:
     
     @staticmethod
@@ -222,6 +774,7 @@ class UserDatabase:
         """Create new user"""
         user["created_at"] = datetime.utcnow()
         result = await users_collection.insert_one(user)
+        principal_cache.invalidate_user(user["username"])
         return str(result.inserted_id)
     
     @staticmethod
@@ -231,4 +784,5 @@ class UserDatabase:
             {"username": username},
             {"$set": {"last_login": datetime.utcnow()}}
         )
+        principal_cache.invalidate_user(username)
         return result.modified_count > 0
@@ -0,0 +1,231 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple, Union
+import html
+import inspect
+import os
+
+from pdf_generator import pdf_generator
+from pdf_service import get_or_render_pdf
+from response_cache import ResumeSnapshot, encode_json
+
+class Exporter:
+    """One export format rendered from the shared resume IR"""
+
+    def __init__(self, name: str, media_type: str, extension: str, version: str,
+                 render: Callable, cache: bool = True):
+        self.name = name
+        self.media_type = media_type
+        self.extension = extension
+        self.version = version
+        self.render = render
+        # The PDF exporter keeps its own artifact cache (pdf_cache)
+        self.cache = cache
+
+# Registered export formats by name
+EXPORTERS: Dict[str, Exporter] = {}
+
+def register_exporter(name: str, media_type: str, extension: str, version: str = "1", cache: bool = True):
+    """Decorator registering ``render(ir) -> bytes`` (sync) or ``render(snapshot)`` (async)"""
+    def decorator(render):
+        EXPORTERS[name] = Exporter(name, media_type, extension, version, render, cache)
+        return render
+    return decorator
+
+class ExportEngine:
+    """Renders registered formats and caches each result per resume version"""
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._artifacts: "OrderedDict[Tuple[str, str, str], Union[bytes, memoryview]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def export(self, snapshot: ResumeSnapshot, name: str) -> Union[bytes, memoryview]:
+        exporter = EXPORTERS[name]
+        if not exporter.cache:
+            return await exporter.render(snapshot)
+
+        key = (snapshot.cache_key, exporter.name, exporter.version)
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            self._artifacts.move_to_end(key)
+            self.hits += 1
+            return artifact
+
+        self.misses += 1
+        if inspect.iscoroutinefunction(exporter.render):
+            artifact = await exporter.render(snapshot)
+        else:
+            artifact = exporter.render(snapshot.ir)
+        self._artifacts[key] = artifact
+        while len(self._artifacts) > self.max_entries:
+            self._artifacts.popitem(last=False)
+        return artifact
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._artifacts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "formats": sorted(EXPORTERS),
+        }
+
+def _contact_parts(info: dict) -> list:
+    return [info[k] for k in ("email", "phone", "location") if info.get(k)]
+
+def _duration(entry: dict) -> str:
+    duration = entry.get("duration", "")
+    return f"{duration} (Current)" if entry.get("current") else duration
+
+@register_exporter("pdf", "application/pdf", "pdf", version=pdf_generator.GENERATOR_VERSION, cache=False)
+async def export_pdf(snapshot: ResumeSnapshot) -> Union[bytes, memoryview]:
+    return await get_or_render_pdf(snapshot)
+
+@register_exporter("txt", "text/plain; charset=utf-8", "txt")
+def export_text(ir: dict) -> bytes:
+    info = ir["personal_info"]
+    lines = [info.get("name", ""), info.get("title", ""), " | ".join(_contact_parts(info))]
+    if info.get("linkedin"):
+        lines.append(f"LinkedIn: {info['linkedin']}")
+
+    def section(title):
+        lines.extend(["", title.upper(), "=" * len(title)])
+
+    if ir["highlights"]:
+        section("Highlights of Qualifications")
+        lines.extend(f"- {h}" for h in ir["highlights"])
+    if ir["experience"]:
+        section("Professional Experience")
+        for exp in ir["experience"]:
+            lines.extend(["", exp["position"], f"{exp['company']}, {exp['location']}", _duration(exp), exp["description"]])
+            lines.extend(f"- {a}" for a in exp["achievements"])
+    if ir["education"]:
+        section("Education & Certifications")
+        for edu in ir["education"]:
+            place = f"{edu['institution']}, {edu['location']}" if edu["location"] else edu["institution"]
+            lines.extend(["", edu["degree"], place, edu["duration"]])
+    if ir["skills"]:
+        section("Core Competencies")
+        lines.extend(f"- {s}" for s in ir["skills"])
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+@register_exporter("md", "text/markdown; charset=utf-8", "md")
+def export_markdown(ir: dict) -> bytes:
+    info = ir["personal_info"]
+    lines = [f"# {info.get('name', '')}", "", f"*{info.get('title', '')}*", "", " · ".join(_contact_parts(info))]
+    if info.get("linkedin"):
+        lines.extend(["", f"[LinkedIn]({info['linkedin']})"])
+    if ir["highlights"]:
+        lines.extend(["", "## Highlights of Qualifications", ""])
+        lines.extend(f"- {h}" for h in ir["highlights"])
+    if ir["experience"]:
+        lines.extend(["", "## Professional Experience"])
+        for exp in ir["experience"]:
+            lines.extend(["", f"### {exp['position']}", f"**{exp['company']}** · {exp['location']} · *{_duration(exp)}*", "", exp["description"]])
+            if exp["achievements"]:
+                lines.append("")
+                lines.extend(f"- {a}" for a in exp["achievements"])
+    if ir["education"]:
+        lines.extend(["", "## Education & Certifications", ""])
+        for edu in ir["education"]:
+            place = f" · {edu['location']}" if edu["location"] else ""
+            lines.append(f"- **{edu['degree']}**, {edu['institution']}{place} · *{edu['duration']}*")
+    if ir["skills"]:
+        lines.extend(["", "## Core Competencies", ""])
+        lines.extend(f"- {s}" for s in ir["skills"])
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+@register_exporter("html", "text/html; charset=utf-8", "html")
+def export_html(ir: dict) -> bytes:
+    e = html.escape
+    info = ir["personal_info"]
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        f"<title>{e(info.get('name', ''))}</title></head><body>",
+        f"<header><h1>{e(info.get('name', ''))}</h1><p>{e(info.get('title', ''))}</p>",
+        f"<p>{' &bull; '.join(e(p) for p in _contact_parts(info))}</p>",
+    ]
+    if info.get("linkedin"):
+        parts.append(f'<p><a href="{e(info["linkedin"])}">LinkedIn</a></p>')
+    parts.append("</header>")
+    if ir["highlights"]:
+        parts.append("<section><h2>Highlights of Qualifications</h2><ul>")
+        parts.extend(f"<li>{e(h)}</li>" for h in ir["highlights"])
+        parts.append("</ul></section>")
+    if ir["experience"]:
+        parts.append("<section><h2>Professional Experience</h2>")
+        for exp in ir["experience"]:
+            parts.append(
+                f"<article><h3>{e(exp['position'])}</h3>"
+                f"<p>{e(exp['company'])} &bull; {e(exp['location'])}</p>"
+                f"<p><em>{e(_duration(exp))}</em></p><p>{e(exp['description'])}</p>"
+            )
+            if exp["achievements"]:
+                parts.append("<ul>" + "".join(f"<li>{e(a)}</li>" for a in exp["achievements"]) + "</ul>")
+            parts.append("</article>")
+        parts.append("</section>")
+    if ir["education"]:
+        parts.append("<section><h2>Education &amp; Certifications</h2>")
+        for edu in ir["education"]:
+            place = f" &bull; {e(edu['location'])}" if edu["location"] else ""
+            parts.append(
+                f"<article><h3>{e(edu['degree'])}</h3><p>{e(edu['institution'])}{place}</p>"
+                f"<p><em>{e(edu['duration'])}</em></p></article>"
+            )
+        parts.append("</section>")
+    if ir["skills"]:
+        parts.append("<section><h2>Core Competencies</h2><ul>")
+        parts.extend(f"<li>{e(s)}</li>" for s in ir["skills"])
+        parts.append("</ul></section>")
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+@register_exporter("json", "application/json", "json")
+def export_json_resume(ir: dict) -> bytes:
+    """JSON Resume (https://jsonresume.org/schema) document"""
+    info = ir["personal_info"]
+
+    def dated(entry: dict, fields: dict) -> dict:
+        if entry.get("start_date"):
+            fields["startDate"] = entry["start_date"]
+        if entry.get("end_date") and not entry.get("current"):
+            fields["endDate"] = entry["end_date"]
+        return fields
+
+    basics = {
+        "name": info.get("name", ""),
+        "label": info.get("title", ""),
+        "email": info.get("email", ""),
+        "phone": info.get("phone", ""),
+        "location": {"address": info.get("location", "")},
+        "profiles": [{"network": "LinkedIn", "url": info["linkedin"]}] if info.get("linkedin") else [],
+        "summary": " ".join(ir["highlights"]),
+    }
+    document = {
+        "$schema": "https://raw.githubusercontent.com/jsonresume/resume-schema/v1.0.0/schema.json",
+        "basics": basics,
+        "work": [
+            dated(exp, {
+                "name": exp["company"],
+                "position": exp["position"],
+                "location": exp["location"],
+                "summary": exp["description"],
+                "highlights": exp["achievements"],
+            })
+            for exp in ir["experience"]
+        ],
+        "education": [
+            dated(edu, {"institution": edu["institution"], "area": edu["degree"]})
+            for edu in ir["education"]
+        ],
+        "skills": [{"name": skill} for skill in ir["skills"]],
+    }
+    if ir.get("updated_at"):
+        document["meta"] = {"lastModified": ir["updated_at"].isoformat()}
+    return encode_json(document)
+
+# Global export engine instance
+export_engine = ExportEngine(max_entries=int(os.environ.get("EXPORT_CACHE_SIZE", "32")))
@@ -0,0 +1,185 @@
+from fastapi import Request, Response
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, List, Optional, Tuple, Union
+import hashlib
+import re
+
+# Clients may keep a copy but must revalidate it before use
+CACHE_CONTROL = "public, no-cache"
+
+# ETags of resume payloads start with the resume version and _id, so a
+# recreated resume restarting at version 1 never reuses one:
+# "v12.<_id>", "v12.<_id>-gzip", "v12.<_id>-experience"
+VERSION_ETAG = re.compile(r'^"v(\d+)\.([0-9a-f]{24})(?:-[^"]*)?"$')
+
+def content_hash(data: bytes) -> str:
+    """Stable digest of a response body"""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+def make_etag(*parts: str) -> str:
+    """Build a strong ETag from one or more opaque parts"""
+    return '"' + "-".join(parts) + '"'
+
+def http_date(value: Optional[datetime]) -> Optional[str]:
+    """Format a (naive UTC) datetime as an HTTP date"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def _etag_list(header: str) -> list:
+    """Split an If-None-Match header into opaque tags (weak prefixes removed)"""
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+def version_tag(version: int, resume_id) -> str:
+    """Opaque name of one version of one resume document"""
+    return f"v{version}.{resume_id}"
+
+def version_etag(version: int, resume_id) -> str:
+    """ETag naming one version of the resume"""
+    return make_etag(version_tag(version, resume_id))
+
+def if_match_versions(header: Optional[str]) -> Optional[List[Tuple[int, str]]]:
+    """(version, resume _id) pairs named by an If-Match header.
+
+    None when there is no header or it is ``*``. Weak and unrecognised tags
+    never match (If-Match uses strong comparison), so they may leave the
+    list empty.
+    """
+    if header is None:
+        return None
+    tags = [tag.strip() for tag in header.split(",") if tag.strip()]
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        match = VERSION_ETAG.match(tag)
+        if match:
+            versions.append((int(match.group(1)), match.group(2)))
+    return versions
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    """Headers sent with both full and 304 responses"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    modified = http_date(last_modified)
+    if modified:
+        headers["Last-Modified"] = modified
+    return headers
+
+def is_not_modified(request: Request, etags: Iterable[str], last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        tags = _etag_list(if_none_match)
+        return "*" in tags or any(tag in tags for tag in etags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        since = _parse_http_date(if_modified_since)
+        if since is None:
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified_response(headers: dict) -> Response:
+    """Empty 304 carrying the validators"""
+    return Response(status_code=304, headers=headers)
+
+class BufferResponse(Response):
+    """Sends an in-memory (or memory-mapped) buffer in fixed-size chunks.
+
+    Unlike StreamingResponse over a BytesIO, the body is never copied as a
+    whole: each chunk is sliced from a memoryview right before it is sent.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, buffer: Union[bytes, memoryview], status_code: int = 200,
+                 headers: Optional[dict] = None, media_type: Optional[str] = None):
+        self.buffer = memoryview(buffer)
+        headers = {**(headers or {}), "Content-Length": str(len(self.buffer))}
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") != "HEAD":
+            view = self.buffer
+            for start in range(0, len(view), self.chunk_size):
+                chunk = bytes(view[start:start + self.chunk_size])
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single "bytes=" range into inclusive (start, end).
+
+    Returns None for ranges we ignore (multiple ranges, other units, garbage),
+    which means the full body is served. Raises ValueError when the range is
+    well-formed but cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not sep or not (first or last) or not (first or "0").isdigit() or not (last or "0").isdigit():
+        return None
+    if first:
+        start = int(first)
+        end = int(last) if last else max(start, size - 1)
+        if start > end:
+            # Syntactically invalid, so the header is ignored
+            return None
+    else:
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        start, end = max(0, size - length), size - 1
+    if start >= size:
+        raise ValueError("Range starts past the end")
+    return start, min(end, size - 1)
+
+def range_response(request: Request, buffer: Union[bytes, memoryview], media_type: str,
+                   headers: dict, etag: Optional[str] = None) -> Response:
+    """Full or partial (206) response for a buffer, honouring Range and If-Range"""
+    view = memoryview(buffer)
+    size = len(view)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return BufferResponse(view[start:end + 1], status_code=206, headers=headers, media_type=media_type)
+
+    return BufferResponse(view, headers=headers, media_type=media_type)
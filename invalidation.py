@@ -0,0 +1,244 @@
+from pathlib import Path
+from pymongo.errors import OperationFailure, PyMongoError
+from typing import Callable, List, Optional
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+
+import database
+from cache import resume_cache, principal_cache
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning change streams are not available at all
+# (standalone mongod, or a deployment without the $changeStream stage)
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40324, 20}
+
+class InvalidationWatcher:
+    """Keeps every worker's in-process caches in step with writes made elsewhere.
+
+    Each worker invalidates its own caches when it writes (see database.py).
+    This watcher handles writes made by *other* workers:
+
+    - ``changestream``: watches the ``resumes`` and ``users`` collections. Any
+      change to a resume bumps the local resume version; a user change drops
+      that user's cached principals. A worker also sees its own writes; those
+      are recognised by the resume ``version`` they produced and skipped.
+    - ``file``: for deployments without change streams (standalone mongod,
+      tests). Local invalidations are appended to a shared file that every
+      worker on the host tails.
+    - ``local``: a single worker; nothing needs to cross process boundaries.
+
+    ``auto`` uses change streams when the server supports them, otherwise the
+    file if ``path`` is set, otherwise local.
+    """
+
+    def __init__(self, mode: str = "auto", path: Optional[str] = None, poll_interval: float = 0.5,
+                 retry_interval: float = 5.0, max_file_bytes: int = 1024 * 1024):
+        self.requested_mode = mode
+        self.mode: Optional[str] = None
+        self.path = Path(path) if path else None
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self.max_file_bytes = max_file_bytes
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._offset = 0
+        self.received = 0
+        self.published = 0
+        self.skipped = 0
+        self.errors = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        mode = self.requested_mode
+        if mode in ("auto", "changestream"):
+            if await self._change_streams_available():
+                mode = "changestream"
+            else:
+                if mode == "changestream":
+                    logger.warning("Change streams are unavailable, falling back")
+                mode = "file" if self.path else "local"
+        if mode == "file" and not self.path:
+            logger.warning("INVALIDATION_PATH is not set; cache invalidation stays local")
+            mode = "local"
+        self.mode = mode
+
+        if mode == "changestream":
+            self._tasks = [
+                asyncio.create_task(self._watch(database.resumes_collection, self._on_resume_change)),
+                asyncio.create_task(self._watch(database.users_collection, self._on_user_change, "updateLookup")),
+            ]
+        elif mode == "file":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.touch(exist_ok=True)
+            # Only events published from now on are relevant to this worker
+            self._offset = self.path.stat().st_size
+            resume_cache.listeners.append(self._publish_resume)
+            principal_cache.listeners.append(self._publish_user)
+            self._tasks = [asyncio.create_task(self._tail())]
+        logger.info(f"Cache invalidation mode: {mode}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._publish_resume in resume_cache.listeners:
+            resume_cache.listeners.remove(self._publish_resume)
+        if self._publish_user in principal_cache.listeners:
+            principal_cache.listeners.remove(self._publish_user)
+
+    # Applying remote events
+
+    def _invalidate_resume(self) -> None:
+        self.received += 1
+        resume_cache.invalidate(broadcast=False)
+
+    def _invalidate_user(self, username: Optional[str]) -> None:
+        self.received += 1
+        if username:
+            principal_cache.invalidate_user(username, broadcast=False)
+        else:
+            # Deleted documents carry no username; drop every principal
+            principal_cache.clear()
+
+    # Change streams
+
+    async def _change_streams_available(self) -> bool:
+        try:
+            stream = database.resumes_collection.watch(max_await_time_ms=1)
+            try:
+                # Opens the cursor; returns None when there is nothing new yet
+                await stream.try_next()
+            finally:
+                await stream.close()
+            return True
+        except OperationFailure as e:
+            if e.code not in CHANGE_STREAMS_UNSUPPORTED:
+                logger.warning(f"Could not open a change stream: {str(e)}")
+            return False
+        except PyMongoError as e:
+            logger.warning(f"Could not open a change stream: {str(e)}")
+            return False
+
+    def _on_resume_change(self, change: Optional[dict]) -> None:
+        updated = ((change or {}).get("updateDescription") or {}).get("updatedFields") or {}
+        if "version" in updated and resume_cache.is_current(updated["version"]):
+            # Our own write (or an older one), already reflected in the cache
+            self.skipped += 1
+            return
+        self._invalidate_resume()
+
+    def _on_user_change(self, change: Optional[dict]) -> None:
+        username = ((change or {}).get("fullDocument") or {}).get("username")
+        self._invalidate_user(username)
+
+    async def _watch(self, collection, handler: Callable[[Optional[dict]], None],
+                     full_document: Optional[str] = None) -> None:
+        """Follow one collection's change stream, resuming after errors"""
+        options = {"full_document": full_document} if full_document else {}
+        resume_token = None
+        reconnecting = False
+        while True:
+            try:
+                async with collection.watch(resume_after=resume_token, **options) as stream:
+                    if reconnecting and resume_token is None:
+                        # Changes made while the stream was down cannot be replayed
+                        handler(None)
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        handler(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.errors += 1
+                logger.error(f"Change stream on {collection.name} failed: {str(e)}")
+                # e.g. the resume token fell off the oplog; start from now
+                resume_token = None
+            except PyMongoError as e:
+                self.errors += 1
+                logger.error(f"Change stream on {collection.name} interrupted: {str(e)}")
+            reconnecting = True
+            await asyncio.sleep(self.retry_interval)
+
+    # Shared file
+
+    def _publish(self, event: dict) -> None:
+        event["origin"] = self.origin
+        line = json.dumps(event) + "\n"
+        try:
+            if self.path.stat().st_size > self.max_file_bytes:
+                # Readers notice the shrink and start over from the beginning
+                self.path.write_text("", encoding="utf-8")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.published += 1
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Could not publish cache invalidation: {str(e)}")
+
+    def _publish_resume(self) -> None:
+        self._publish({"type": "resume"})
+
+    def _publish_user(self, username: str) -> None:
+        self._publish({"type": "user", "username": username})
+
+    def _read_events(self) -> List[dict]:
+        size = self.path.stat().st_size
+        if size < self._offset:
+            self._offset = 0
+        if size == self._offset:
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            data = f.read()
+        # Leave a partially written last line for the next poll
+        complete = data[:data.rfind("\n") + 1]
+        self._offset += len(complete.encode("utf-8"))
+        events = []
+        for line in complete.splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    async def _tail(self) -> None:
+        while True:
+            try:
+                for event in self._read_events():
+                    if event.get("origin") == self.origin:
+                        continue
+                    if event.get("type") == "resume":
+                        self._invalidate_resume()
+                    elif event.get("type") == "user":
+                        self._invalidate_user(event.get("username"))
+            except OSError as e:
+                self.errors += 1
+                logger.error(f"Could not read cache invalidations: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "received": self.received,
+            "published": self.published,
+            "skipped": self.skipped,
+            "errors": self.errors,
+        }
+
+# Global invalidation watcher
+invalidation_watcher = InvalidationWatcher(
+    mode=os.environ.get("INVALIDATION_MODE", "auto").lower(),
+    path=os.environ.get("INVALIDATION_PATH") or None,
+    poll_interval=float(os.environ.get("INVALIDATION_POLL_INTERVAL", "0.5")),
+)
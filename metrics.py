@@ -0,0 +1,285 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import bisect
+import functools
+import inspect
+import threading
+import time
+
+# Prefix for every exported metric name
+NAMESPACE = "resume_api"
+
+# Latency buckets in seconds, from cached reads up to slow PDF renders
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """A metric family: one value (or histogram) per combination of label values.
+
+    Updates take a lock, since bcrypt and render timings may be recorded from
+    worker threads.
+    """
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = f"{NAMESPACE}_{name}"
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return lines
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class MetricsRegistry:
+    """Holds every metric family plus ``stats()`` sources read at scrape time"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._stats_sources: List[Tuple[str, str, Callable[[], dict]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def register_stats(self, group: str, component: str, source: Callable[[], dict]) -> None:
+        """Export the numeric fields of ``source()`` as ``<group>_<field>{<group>="<component>"}``"""
+        self._stats_sources.append((group, component, source))
+
+    def _stats_lines(self) -> List[str]:
+        families: Dict[str, List[str]] = {}
+        for group, component, source in self._stats_sources:
+            for field, value in source().items():
+                # Booleans become 0/1; strings and None are not exportable
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                name = f"{NAMESPACE}_{group}_{field}"
+                families.setdefault(name, []).append(
+                    f"{name}{_format_labels((group,), (component,))} {_format_value(value)}"
+                )
+        lines = []
+        for name, samples in families.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(samples)
+        return lines
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(self._stats_lines())
+        return "\n".join(lines) + "\n"
+
+# Global registry and the metrics recorded across modules
+metrics = MetricsRegistry()
+
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status"))
+http_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",))
+http_latency = metrics.histogram(
+    "http_request_duration_seconds", "Time to the end of the response body", ("method", "route"))
+db_latency = metrics.histogram(
+    "db_operation_duration_seconds", "Database class calls that reach the database", ("operation",))
+db_errors = metrics.counter(
+    "db_operation_errors_total", "Database class calls that raised", ("operation",))
+db_pool_wait = metrics.histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check a connection out of the MongoDB pool")
+password_latency = metrics.histogram(
+    "password_hash_duration_seconds", "bcrypt work including executor queueing", ("operation",))
+pdf_render_latency = metrics.histogram(
+    "pdf_render_duration_seconds", "PDF renders in the render pool", ("outcome",))
+
+# The timed database call in progress, so the calls it makes are not timed again
+_db_operation: ContextVar[Optional[str]] = ContextVar("db_operation", default=None)
+
+def instrument_db(*methods: str):
+    """Class decorator timing coroutine (static)methods as ``Class.method``.
+
+    Only the named methods are timed (every coroutine staticmethod if none are
+    named), so methods served from in-process caches can be left out. A timed
+    call made from inside another one is counted as part of the outer call.
+    """
+    def wrap(fn, operation):
+        @functools.wraps(fn)
+        async def timed(*args, **kwargs):
+            if _db_operation.get() is not None:
+                return await fn(*args, **kwargs)
+            token = _db_operation.set(operation)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                db_errors.inc(operation=operation)
+                raise
+            finally:
+                _db_operation.reset(token)
+                db_latency.observe(time.perf_counter() - started, operation=operation)
+        return timed
+
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if methods and attr not in methods:
+                continue
+            if not isinstance(value, staticmethod) or not inspect.iscoroutinefunction(value.__func__):
+                continue
+            setattr(cls, attr, staticmethod(wrap(value.__func__, f"{cls.__name__}.{attr}")))
+        return cls
+    return decorate
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, in-flight requests and latency.
+
+    Requests are labelled with the matched route template (``/api/resume/
+    experience/{exp_id}``), never the raw path, to keep label values bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+        # The route is only known once routing has run, so in-flight is per method
+        http_in_flight.inc(method=method)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec(method=method)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_requests.inc(method=method, route=template, status=str(status_code))
+            http_latency.observe(time.perf_counter() - started, method=method, route=template)
@@ -90,6 +90,33 @@ class SkillsUpdate(BaseModel):
 class HighlightsUpdate(BaseModel):
     highlights: List[str] = Field(..., min_items=1)
 
+# Batch Models
+class BatchOperationType(str, Enum):
+    UPDATE_PERSONAL_INFO = "update_personal_info"
+    SET_HIGHLIGHTS = "set_highlights"
+    SET_SKILLS = "set_skills"
+    ADD_EXPERIENCE = "add_experience"
+    UPDATE_EXPERIENCE = "update_experience"
+    DELETE_EXPERIENCE = "delete_experience"
+    ADD_EDUCATION = "add_education"
+    UPDATE_EDUCATION = "update_education"
+    DELETE_EDUCATION = "delete_education"
+
+class BatchOperation(BaseModel):
+    op: BatchOperationType
+    id: Optional[str] = None  # experience/education id for update_* and delete_*
+    data: Optional[dict] = None  # validated against the matching *Create/*Update model
+
+class ResumeBatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_items=1, max_items=200)
+
+class BatchOperationResult(BaseModel):
+    index: int
+    op: BatchOperationType
+    success: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
 # Contact Models
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+import asyncio
+import logging
+import mmap
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+class PdfCache:
+    """Rendered PDF artifacts keyed by resume version and generator version.
+
+    Entries live in a small in-memory LRU; when ``cache_dir`` is set they are
+    also written to disk so a restarted worker does not have to re-render.
+    Each edit produces a new key, so only the ``max_disk_entries`` most
+    recently written files are kept. Disk entries are memory-mapped rather
+    than read, so they are served straight from the page cache.
+    """
+
+    def __init__(self, max_entries: int = 8, cache_dir: Optional[str] = None, max_disk_entries: int = 4):
+        self.max_entries = max(1, max_entries)
+        self.max_disk_entries = max(1, max_disk_entries)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: "OrderedDict[str, Union[bytes, memoryview]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(resume_key: str, generator_version: str) -> str:
+        return f"{resume_key}-{generator_version}"
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pdf"
+
+    def __contains__(self, key: str) -> bool:
+        """Presence check that does not count towards hit/miss stats"""
+        if key in self._entries:
+            return True
+        return bool(self.cache_dir) and self._path(key).exists()
+
+    def get(self, key: str) -> Optional[Union[bytes, memoryview]]:
+        """Look a rendered PDF up in memory, then on disk"""
+        pdf_bytes = self._entries.get(key)
+        if pdf_bytes is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pdf_bytes
+
+        if self.cache_dir:
+            try:
+                pdf_bytes = self._map(key)
+            except FileNotFoundError:
+                pdf_bytes = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read cached PDF {key}: {str(e)}")
+                pdf_bytes = None
+            if pdf_bytes is not None:
+                self._remember(key, pdf_bytes)
+                self.disk_hits += 1
+                return pdf_bytes
+
+        self.misses += 1
+        return None
+
+    def _map(self, key: str) -> memoryview:
+        """Read-only view of a disk entry; the mapping lives as long as the view"""
+        with open(self._path(key), "rb") as f:
+            return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    async def put(self, key: str, pdf_bytes: bytes) -> None:
+        """Store a freshly rendered PDF; the disk copy is written off the event loop"""
+        self._remember(key, pdf_bytes)
+        if self.cache_dir:
+            await asyncio.get_running_loop().run_in_executor(None, self._store, key, pdf_bytes)
+
+    def _store(self, key: str, pdf_bytes: bytes) -> None:
+        try:
+            # Write to a temp file and rename so readers never see a partial PDF
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not write cached PDF {key}: {str(e)}")
+            return
+        self._prune(key)
+
+    def _prune(self, keep: str) -> None:
+        """Delete all but the newest ``max_disk_entries`` PDFs on disk, never ``keep``"""
+        def mtime(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                # Already removed (e.g. by another worker)
+                return 0.0
+
+        files = sorted(self.cache_dir.glob("*.pdf"), key=mtime, reverse=True)
+        for path in files[self.max_disk_entries:]:
+            if path == self._path(keep):
+                continue
+            try:
+                # Mapped views of the file stay readable after the unlink
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove cached PDF {path.name}: {str(e)}")
+
+    def _remember(self, key: str, pdf_bytes: Union[bytes, memoryview]) -> None:
+        self._entries[key] = pdf_bytes
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (disk entries stay until pruned by later puts)"""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(len(v) for v in self._entries.values()),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk": str(self.cache_dir) if self.cache_dir else None,
+        }
+
+# Global PDF cache instance
+pdf_cache = PdfCache(
+    max_entries=int(os.environ.get("PDF_CACHE_SIZE", "8")),
+    cache_dir=os.environ.get("PDF_CACHE_DIR") or None,
+    max_disk_entries=int(os.environ.get("PDF_CACHE_DISK_ENTRIES", "4")),
+)
@@ -0,0 +1,124 @@
+from typing import Optional, Union
+import asyncio
+import logging
+import os
+import time
+
+from metrics import pdf_render_latency
+from pdf_cache import pdf_cache
+from pdf_generator import pdf_generator, render_resume_pdf
+from render_pool import render_pool, RenderPoolSaturated
+from response_cache import response_cache, ResumeSnapshot
+from singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+def pdf_cache_key(snapshot: ResumeSnapshot) -> str:
+    return pdf_cache.make_key(snapshot.cache_key, pdf_generator.GENERATOR_VERSION)
+
+async def get_or_render_pdf(snapshot: ResumeSnapshot) -> Union[bytes, memoryview]:
+    """Return the cached PDF for this resume version, rendering it if needed"""
+    cache_key = pdf_cache_key(snapshot)
+    pdf_bytes = pdf_cache.get(cache_key)
+    if pdf_bytes is None:
+        # Concurrent downloads of a cold version share one render
+        pdf_bytes = await single_flight.do(("pdf", cache_key), lambda: _render(snapshot, cache_key))
+    return pdf_bytes
+
+async def _render(snapshot: ResumeSnapshot, cache_key: str) -> bytes:
+    # ReportLab is CPU-bound; render in the worker pool, not on the event loop
+    started = time.perf_counter()
+    try:
+        pdf_bytes = await render_pool.run(render_resume_pdf, snapshot.ir)
+    except RenderPoolSaturated:
+        pdf_render_latency.observe(time.perf_counter() - started, outcome="rejected")
+        raise
+    except Exception:
+        pdf_render_latency.observe(time.perf_counter() - started, outcome="error")
+        raise
+    pdf_render_latency.observe(time.perf_counter() - started, outcome="ok")
+    await pdf_cache.put(cache_key, pdf_bytes)
+    return pdf_bytes
+
+class PdfPrerenderer:
+    """Re-renders the PDF in the background after admin edits.
+
+    ``schedule()`` is cheap and may be called after every write; the worker
+    waits until no new edit has arrived for ``delay`` seconds, so a burst of
+    edits produces a single render. The finished artifact is swapped into the
+    PDF cache in one step, so downloads see either the old or the new PDF.
+    """
+
+    def __init__(self, delay: float = 2.0, enabled: bool = True):
+        self.delay = delay
+        self.enabled = enabled
+        self._requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.scheduled = 0
+        self.renders = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        if not self.enabled or (self._task and not self._task.done()):
+            return
+        self._requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def schedule(self) -> None:
+        """Request a re-render once the current burst of edits settles"""
+        if not self.enabled:
+            return
+        self.start()
+        self.scheduled += 1
+        self._requested.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._requested.wait()
+            # Debounce: keep waiting while edits keep arriving
+            while True:
+                self._requested.clear()
+                try:
+                    await asyncio.wait_for(self._requested.wait(), self.delay)
+                except asyncio.TimeoutError:
+                    break
+            await self._render()
+
+    async def _render(self) -> None:
+        try:
+            snapshot = await response_cache.get_snapshot()
+            if not snapshot or pdf_cache_key(snapshot) in pdf_cache:
+                return
+            await get_or_render_pdf(snapshot)
+            self.renders += 1
+        except RenderPoolSaturated as e:
+            # Visitors are using the pool; try again once it has drained
+            logger.info("PDF pre-render deferred, render pool busy")
+            await asyncio.sleep(e.retry_after)
+            self._requested.set()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Error pre-rendering PDF: {str(e)}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "scheduled": self.scheduled,
+            "renders": self.renders,
+            "failures": self.failures,
+        }
+
+# Global pre-renderer instance
+pdf_prerenderer = PdfPrerenderer(
+    delay=float(os.environ.get("PDF_PRERENDER_DELAY", "2.0")),
+    enabled=os.environ.get("PDF_PRERENDER", "true").lower() in ("1", "true", "yes"),
+)
@@ -0,0 +1,133 @@
+from collections import deque, OrderedDict
+from typing import Deque, Dict
+import math
+import os
+import time
+
+class LoginThrottled(Exception):
+    """Raised when a login attempt is rejected before any password work"""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+class SlidingWindow:
+    """Per-key event timestamps over the last ``window`` seconds, with a bounded key count"""
+
+    def __init__(self, limit: int, window: float, max_keys: int = 10000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def _prune(self, key: str, now: float) -> Deque[float]:
+        events = self._events.get(key)
+        if events is None:
+            return deque()
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+        return events
+
+    def retry_after(self, key: str, now: float) -> float:
+        """Seconds until ``key`` is below its limit again (0 if it already is)"""
+        events = self._prune(key, now)
+        if len(events) < self.limit:
+            return 0.0
+        return events[len(events) - self.limit] + self.window - now
+
+    def add(self, key: str, now: float) -> None:
+        events = self._events.get(key)
+        if events is None:
+            events = self._events[key] = deque()
+            # Forget the least recently seen keys rather than grow without bound
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+        else:
+            self._events.move_to_end(key)
+        events.append(now)
+
+    def reset(self, key: str) -> None:
+        self._events.pop(key, None)
+
+class LoginThrottle:
+    """Cheap admission control for /api/auth/login.
+
+    Attempts are limited per client IP (all attempts) and per username (failed
+    attempts only, so a legitimate admin is not locked out by their own
+    logins), and the number of concurrent password checks is capped per IP
+    and globally. Everything is checked before bcrypt runs.
+    """
+
+    def __init__(self, ip_limit: int = 20, user_limit: int = 5, window: float = 300.0,
+                 max_in_flight_per_ip: int = 2, max_in_flight: int = 8):
+        self.ip_attempts = SlidingWindow(ip_limit, window)
+        self.user_failures = SlidingWindow(user_limit, window)
+        self.max_in_flight_per_ip = max_in_flight_per_ip
+        self.max_in_flight = max_in_flight
+        self._in_flight: Dict[str, int] = {}
+        self._total_in_flight = 0
+        self.rejected = 0
+
+    def acquire(self, ip: str, username: str) -> None:
+        """Admit a login attempt or raise LoginThrottled"""
+        now = time.monotonic()
+        username = username.lower()
+
+        if self._total_in_flight >= self.max_in_flight:
+            self._reject(1, "Too many concurrent login attempts")
+        if self._in_flight.get(ip, 0) >= self.max_in_flight_per_ip:
+            self._reject(1, "Too many concurrent login attempts")
+
+        wait = max(self.ip_attempts.retry_after(ip, now), self.user_failures.retry_after(username, now))
+        if wait > 0:
+            self._reject(wait, "Too many login attempts")
+
+        self.ip_attempts.add(ip, now)
+        self._in_flight[ip] = self._in_flight.get(ip, 0) + 1
+        self._total_in_flight += 1
+
+    def release(self, ip: str) -> None:
+        """Mark an admitted attempt as finished"""
+        count = self._in_flight.get(ip, 0) - 1
+        if count > 0:
+            self._in_flight[ip] = count
+        else:
+            self._in_flight.pop(ip, None)
+        self._total_in_flight = max(0, self._total_in_flight - 1)
+
+    def record_failure(self, username: str) -> None:
+        self.user_failures.add(username.lower(), time.monotonic())
+
+    def record_success(self, username: str) -> None:
+        self.user_failures.reset(username.lower())
+
+    def _reject(self, retry_after: float, reason: str) -> None:
+        self.rejected += 1
+        raise LoginThrottled(max(1, math.ceil(retry_after)), reason)
+
+    def stats(self) -> dict:
+        return {"in_flight": self._total_in_flight, "rejected": self.rejected}
+
+def client_ip(request) -> str:
+    """Best-effort client address for rate limiting.
+
+    Behind a trusted proxy (TRUST_FORWARDED_FOR=true, e.g. the Heroku router)
+    the proxy appends the real peer address as the last X-Forwarded-For entry.
+    """
+    if os.environ.get("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes"):
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+# Global login throttle instance
+login_throttle = LoginThrottle(
+    ip_limit=int(os.environ.get("LOGIN_IP_LIMIT", "20")),
+    user_limit=int(os.environ.get("LOGIN_USER_FAILURE_LIMIT", "5")),
+    window=float(os.environ.get("LOGIN_WINDOW_SECONDS", "300")),
+    max_in_flight_per_ip=int(os.environ.get("LOGIN_MAX_IN_FLIGHT_PER_IP", "2")),
+    max_in_flight=int(os.environ.get("LOGIN_MAX_IN_FLIGHT", "8")),
+)
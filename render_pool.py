@@ -0,0 +1,136 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, BrokenExecutor
+from typing import Any, Callable
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+class RenderPoolSaturated(Exception):
+    """Raised when too many renders are already running or queued"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("PDF render pool is saturated")
+        self.retry_after = retry_after
+
+class RenderPool:
+    """Bounded executor for CPU-bound rendering work.
+
+    Renders run in a process pool so they never hold the event loop (or the
+    GIL); if a process pool cannot be created the pool falls back to threads.
+    At most ``max_workers + max_queue`` renders are admitted at once, anything
+    beyond that is rejected immediately with ``RenderPoolSaturated``.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 4, mode: str = "process",
+                 timeout: float = 60.0, retry_after: int = 5):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.mode = mode
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor: Executor = None
+        self._pending = 0
+        # Timing counters
+        self.renders = 0
+        self.failures = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seconds = 0.0
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "process":
+            try:
+                return ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError, ImportError) as e:
+                logger.warning(f"Process pool unavailable, rendering in threads: {str(e)}")
+                self.mode = "thread"
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-render")
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The loop is already closed (shutdown)
+            self._release()
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` in the pool, rejecting the call if the pool is full.
+
+        A render holds its slot until the executor is done with it, so one that
+        times out (a running process cannot be cancelled) still counts against
+        the limit until it finishes.
+        """
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise RenderPoolSaturated(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._pending += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Done callbacks run on the executor's thread; release on the loop's
+        future.add_done_callback(lambda _: self._release_threadsafe(loop))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except BrokenExecutor:
+            # A worker died; start a fresh pool for the next render
+            self.failures += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+
+        elapsed = time.perf_counter() - started
+        self.renders += 1
+        self.total_seconds += elapsed
+        self.last_seconds = elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "renders": self.renders,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "avg_seconds": round(self.total_seconds / self.renders, 4) if self.renders else 0.0,
+            "max_seconds": round(self.max_seconds, 4),
+            "last_seconds": round(self.last_seconds, 4),
+        }
+
+# Global render pool instance
+render_pool = RenderPool(
+    max_workers=int(os.environ.get("PDF_RENDER_WORKERS", "2")),
+    max_queue=int(os.environ.get("PDF_RENDER_QUEUE", "4")),
+    mode=os.environ.get("PDF_RENDER_MODE", "process"),
+    timeout=float(os.environ.get("PDF_RENDER_TIMEOUT", "60")),
+)
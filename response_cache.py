@@ -0,0 +1,262 @@
+from fastapi import Request, Response
+from datetime import datetime, date
+from functools import cached_property
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+import asyncio
+import gzip
+import json
+
+from cache import resume_cache
+from database import ResumeDatabase
+from singleflight import single_flight
+from resume_ir import build_resume_ir
+from http_cache import content_hash, make_etag, version_tag, validator_headers, is_not_modified, not_modified_response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip and identity are always available
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Snapshot bodies are compressed once per version in an executor, so they get
+# the smallest output; ?fields= bodies are compressed inline while serving a
+# request, so they use cheaper levels
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+INLINE_GZIP_LEVEL = 6
+INLINE_BROTLI_QUALITY = 5
+
+# Top-level resume fields clients may select with ?fields=
+RESUME_FIELDS = ("personal_info", "highlights", "experience", "education", "skills",
+                 "active", "created_at", "updated_at", "version")
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Normalize a comma-separated ?fields= value; raises ValueError for unknown fields"""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(RESUME_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    # Canonical order so equivalent requests share one cached body
+    return tuple(field for field in RESUME_FIELDS if field in requested) or None
+
+def _json_default(value):
+    """Match the encoding FastAPI's jsonable_encoder would have produced"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_json(content) -> bytes:
+    """Serialize to compact UTF-8 JSON, byte-for-byte like FastAPI's JSONResponse"""
+    return json.dumps(
+        content,
+        default=_json_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Parse an Accept-Encoding header, dropping codings with q=0"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+class EncodedBody:
+    """One JSON payload held as identity, gzip and (optionally) brotli bytes.
+
+    ``tag`` names the payload for ETags (e.g. ``v12-experience``); without
+    one the body is hashed instead.
+    """
+
+    def __init__(self, raw: bytes, tag: Optional[str] = None,
+                 gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY):
+        self.tag = tag or content_hash(raw)
+        self.variants: Dict[str, bytes] = {"identity": raw}
+        self.variants["gzip"] = gzip.compress(raw, compresslevel=gzip_level, mtime=0)
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(raw, quality=brotli_quality)
+        # Strong ETags must differ between content-codings of the same body
+        self.etags: Dict[str, str] = {
+            coding: make_etag(self.tag) if coding == "identity" else make_etag(self.tag, coding)
+            for coding in self.variants
+        }
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        """Pick the smallest variant the client accepts"""
+        accepted = _accepted_encodings(accept_encoding)
+        candidates = [
+            coding for coding in self.variants
+            if coding == "identity" or coding in accepted or "*" in accepted
+        ]
+        return min(candidates, key=lambda coding: len(self.variants[coding]))
+
+    def response(self, request: Request, headers: Optional[dict] = None,
+                 last_modified: Optional[datetime] = None) -> Response:
+        """Full response, or 304 when the client's copy is still current"""
+        coding = self.negotiate(request.headers.get("accept-encoding"))
+        response_headers = {
+            "Vary": "Accept-Encoding",
+            **validator_headers(self.etags[coding], last_modified),
+            **(headers or {}),
+        }
+        if is_not_modified(request, self.etags.values(), last_modified):
+            return not_modified_response(response_headers)
+        if coding != "identity":
+            response_headers["Content-Encoding"] = coding
+        return Response(
+            content=self.variants[coding],
+            media_type=JSON_MEDIA_TYPE,
+            headers=response_headers,
+        )
+
+class ResumeSnapshot:
+    """Pre-serialized public payloads for one version of the resume.
+
+    Given the previous snapshot and the top-level fields changed since it
+    (``ResumeCache.changed_since``), only those fields are re-serialized; the
+    bodies of untouched sections are carried over as they are.
+
+    ETags and the keys of derived artifacts come from the document's
+    ``version``, so nothing is hashed. Documents not written since versions
+    were introduced have none and fall back to hashing the body.
+    """
+
+    # Section bodies: (key in the payload, resume field)
+    SECTIONS = {"experience": ("experiences", "experience"), "education": ("education", "education")}
+
+    def __init__(self, version: int, resume: dict, previous: Optional["ResumeSnapshot"] = None,
+                 changed: Optional[set] = None):
+        self.version = version
+        self.last_modified: Optional[datetime] = resume.get("updated_at")
+        self.doc_version: Optional[int] = resume.get("version")
+        # The _id keeps tags distinct if the resume is ever recreated at the same version
+        prefix = version_tag(self.doc_version, resume.get("_id")) if self.doc_version is not None else None
+        public = {k: v for k, v in resume.items() if k != "_id"}
+        if previous is None or changed is None:
+            previous, changed = None, set(public)
+        else:
+            # Patched documents share untouched values with the previous one;
+            # anything else (e.g. a reload racing the patch) is re-serialized
+            changed = set(changed) | (set(public) ^ set(previous._public)) | {
+                field for field, value in public.items() if previous._public.get(field) is not value
+            }
+
+        # Each field's JSON, so the full body can be assembled from mostly reused parts
+        self._fragments: Dict[str, bytes] = {
+            field: previous._fragments[field] if field not in changed else encode_json(value)
+            for field, value in public.items()
+        }
+        # Same bytes as encode_json(public)
+        raw = b"{" + b",".join(encode_json(field) + b":" + fragment
+                               for field, fragment in self._fragments.items()) + b"}"
+        self.bodies: Dict[str, EncodedBody] = {"resume": EncodedBody(raw, prefix)}
+        for section, (key, field) in self.SECTIONS.items():
+            if previous is not None and field not in changed:
+                self.bodies[section] = previous.bodies[section]
+            else:
+                fragment = self._fragments.get(field, b"[]")
+                self.bodies[section] = EncodedBody(b"{" + encode_json(key) + b":" + fragment + b"}",
+                                                   prefix and f"{prefix}-{section}")
+        # Identifies the resume content for derived artifacts such as the PDF
+        self.cache_key = prefix or self.bodies["resume"].tag
+        self._prefix = prefix
+        self.resume = resume
+        self._public = public
+        self._field_bodies: Dict[Tuple[str, ...], EncodedBody] = {}
+        if previous is not None:
+            self._field_bodies = {
+                fields: body for fields, body in previous._field_bodies.items() if changed.isdisjoint(fields)
+            }
+
+    @cached_property
+    def ir(self) -> dict:
+        """Normalized export representation, built on first use"""
+        return build_resume_ir(self.resume)
+
+    def response(self, section: str, request: Request) -> Response:
+        return self.bodies[section].response(request, last_modified=self.last_modified)
+
+    def fields_response(self, fields: Tuple[str, ...], request: Request) -> Response:
+        """Response containing only the selected top-level fields (encoded once per version)"""
+        body = self._field_bodies.get(fields)
+        if body is None:
+            body = EncodedBody(encode_json({f: self._public[f] for f in fields if f in self._public}),
+                               self._prefix and f"{self._prefix}-{'+'.join(fields)}",
+                               INLINE_GZIP_LEVEL, INLINE_BROTLI_QUALITY)
+            # Replaced rather than updated: a snapshot being built in the
+            # executor may be reading the current dict
+            self._field_bodies = {**self._field_bodies, fields: body}
+        return body.response(request, last_modified=self.last_modified)
+
+class ResponseCache:
+    """Keeps the public resume responses encoded for the current resume version"""
+
+    def __init__(self):
+        self._snapshot: Optional[ResumeSnapshot] = None
+        self.hits = 0
+        self.builds = 0
+        self.patches = 0
+
+    async def get_snapshot(self) -> Optional[ResumeSnapshot]:
+        """Return the snapshot for the current resume, rebuilding it after a write"""
+        # Capture the version before reading so a concurrent write can only
+        # cause a spurious rebuild, never a stale snapshot
+        version = resume_cache.version
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        return await single_flight.do(("snapshot", version), lambda: self._build(version))
+
+    async def _build(self, version: int) -> Optional[ResumeSnapshot]:
+        resume = await ResumeDatabase.get_resume()
+        if not resume:
+            return None
+        previous = self._snapshot
+        # Fields changed since the previous snapshot; None means rebuild everything
+        changed = resume_cache.changed_since(previous.version) if previous else None
+        # Serializing and compressing is CPU work; keep it off the event loop
+        snapshot = await asyncio.get_running_loop().run_in_executor(
+            None, ResumeSnapshot, version, resume, previous, changed
+        )
+        if self._snapshot is None or self._snapshot.version <= version:
+            # A build for a newer version may have finished first
+            self._snapshot = snapshot
+        if previous is not None and changed is not None:
+            self.patches += 1
+        else:
+            self.builds += 1
+        return snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "hits": self.hits,
+            "builds": self.builds,
+            "patches": self.patches,
+            "brotli": brotli is not None,
+        }
+
+# Global response cache instance
+response_cache = ResponseCache()
@@ -0,0 +1,76 @@
+from typing import Any, Dict, List, Optional
+import re
+
+# "8/91", "02/15" -> month/two-digit year
+_MONTH_YEAR = re.compile(r"^\s*(\d{1,2})/(\d{2}|\d{4})\s*$")
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+def _split_duration(duration: str) -> List[str]:
+    """Split "8/91 - 5/95" (hyphen or en dash) into its two ends"""
+    return [part.strip() for part in re.split(r"\s+[-–]\s+|[-–]", duration, maxsplit=1)]
+
+def parse_month_year(value: str) -> Optional[str]:
+    """Turn "8/91" into "1991-08"; None for "present" or anything unparsable"""
+    match = _MONTH_YEAR.match(value or "")
+    if not match:
+        return None
+    month, year = int(match.group(1)), match.group(2)
+    if not 1 <= month <= 12:
+        return None
+    if len(year) == 2:
+        year = ("19" if int(year) >= 50 else "20") + year
+    return f"{year}-{month:02d}"
+
+def _dates(duration: str) -> Dict[str, Optional[str]]:
+    parts = _split_duration(duration) if duration else []
+    return {
+        "start_date": parse_month_year(parts[0]) if parts else None,
+        "end_date": parse_month_year(parts[1]) if len(parts) > 1 else None,
+    }
+
+def build_resume_ir(resume: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized, export-ready view of a resume document.
+
+    Built once per resume version (see ResumeSnapshot.ir) and shared by every
+    exporter, so producing several formats walks the raw document only once.
+    Keys keep the names used in MongoDB so the PDF generator can consume the
+    IR directly.
+    """
+    experience = []
+    for exp in resume.get("experience") or []:
+        duration = _text(exp.get("duration"))
+        experience.append({
+            "id": _text(exp.get("id")),
+            "position": _text(exp.get("position")),
+            "company": _text(exp.get("company")),
+            "location": _text(exp.get("location")),
+            "duration": duration,
+            "current": bool(exp.get("current")),
+            "description": _text(exp.get("description")),
+            "achievements": [_text(a) for a in exp.get("achievements") or []],
+            **_dates(duration),
+        })
+
+    education = []
+    for edu in resume.get("education") or []:
+        duration = _text(edu.get("duration"))
+        education.append({
+            "id": _text(edu.get("id")),
+            "degree": _text(edu.get("degree")),
+            "institution": _text(edu.get("institution")),
+            "location": _text(edu.get("location")),
+            "duration": duration,
+            **_dates(duration),
+        })
+
+    return {
+        # Kept as-is: the PDF header falls back to defaults for missing keys
+        "personal_info": dict(resume.get("personal_info") or {}),
+        "highlights": [_text(h) for h in resume.get("highlights") or []],
+        "experience": experience,
+        "education": education,
+        "skills": [_text(s) for s in resume.get("skills") or []],
+        "updated_at": resume.get("updated_at"),
+    }
@@ -1,22 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from datetime import timedelta
+from typing import List, Optional, Tuple
 import os
 import logging
 from pathlib import Path
-from io import BytesIO
-
-# Import our modules
-from models import *
-from database import ResumeDatabase, ContactDatabase, UserDatabase
-from auth import authenticate_user, create_access_token, get_current_user, require_admin, create_default_admin
-from pdf_generator import pdf_generator
 
+# Load .env before importing our modules, which read their settings at import time
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Import our modules
+from models import *
+from database import ResumeDatabase, ContactDatabase, UserDatabase, ResumeConflictError, ResumeVersionMismatch, ensure_indexes, index_usage_report, db_manager
+from pydantic import ValidationError
+from auth import authenticate_user, create_access_token, get_current_user, require_admin, create_default_admin, password_executor
+from cache import resume_cache, principal_cache
+from singleflight import single_flight
+from response_cache import response_cache, encode_json, parse_fields
+from pdf_cache import pdf_cache
+from render_pool import render_pool, RenderPoolSaturated
+from rate_limit import login_throttle, LoginThrottled, client_ip
+from contact_ingest import contact_ingest, IngestQueueFull
+from pdf_service import pdf_prerenderer
+from invalidation import invalidation_watcher
+from exporters import EXPORTERS, export_engine
+from metrics import metrics, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from http_cache import make_etag, validator_headers, is_not_modified, not_modified_response, range_response, version_etag, if_match_versions
+
 # Create the main app without a prefix
 app = FastAPI(title="Kyle Lynch Resume API", version="1.0.0")
 
@@ -30,8 +43,27 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the resume version for If-Match
+    expose_headers=["ETag"],
 )
 
+# Per-route request counts, in-flight requests and latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Component counters exported on /metrics alongside the request metrics
+metrics.register_stats("cache", "resume", resume_cache.stats)
+metrics.register_stats("cache", "responses", response_cache.stats)
+metrics.register_stats("cache", "pdf", pdf_cache.stats)
+metrics.register_stats("cache", "exports", export_engine.stats)
+metrics.register_stats("cache", "principals", principal_cache.stats)
+metrics.register_stats("single_flight", "default", single_flight.stats)
+metrics.register_stats("invalidation", "default", invalidation_watcher.stats)
+metrics.register_stats("render_pool", "pdf", render_pool.stats)
+metrics.register_stats("prerender", "pdf", pdf_prerenderer.stats)
+metrics.register_stats("contact_queue", "default", contact_ingest.stats)
+metrics.register_stats("login_throttle", "default", login_throttle.stats)
+metrics.register_stats("db_pool", "mongo", db_manager.pool_monitor.stats)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -39,13 +71,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def resume_changed(response: Response, written: dict) -> dict:
+    """Kick off background work that depends on the resume content.
+
+    Also hands the new version back to the client, as an ETag it can send in
+    If-Match with its next write; returns the version for the response data.
+    """
+    response.headers["ETag"] = version_etag(written["version"], written["_id"])
+    pdf_prerenderer.schedule()
+    return {"version": written["version"]}
+
+async def resume_if_match(request: Request) -> Optional[List[Tuple[int, str]]]:
+    """Resume (version, _id) pairs an If-Match header allows a write to apply to"""
+    # async so FastAPI does not hand this header parse to the threadpool
+    return if_match_versions(request.headers.get("if-match"))
+
+def precondition_failed(e: ResumeVersionMismatch) -> HTTPException:
+    """412 carrying the current version's ETag so the client can refetch"""
+    headers = {"ETag": version_etag(e.current.get("version"), e.current["_id"])}
+    return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED,
+                         detail="Resume was modified by another request", headers=headers)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize database with default data"""
+    # Connect and open pooled connections before the first request arrives
+    db_manager.connect()
+    await db_manager.warm_up()
+    await ensure_indexes()
+    # Follow writes made by other workers (change streams or a shared file)
+    await invalidation_watcher.start()
+    await contact_ingest.start()
     await create_default_admin()
     # Initialize resume data if needed
     await ResumeDatabase.get_resume()
+    # Render the PDF before the first visitor asks for it
+    pdf_prerenderer.schedule()
     logger.info("✅ Resume API server started successfully")
 
 # Health check
@@ -53,18 +115,34 @@ async def startup_event():
 async def root():
     return {"message": "Kyle Lynch Resume API is running", "status": "healthy"}
 
+# Readiness probe for load balancers and deploys
+@api_router.get("/health/ready")
+async def readiness():
+    """200 once MongoDB is connected and answering pings, 503 otherwise"""
+    if not await db_manager.check_ready():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unavailable")
+    return {"status": "ready", "mongo_ping_ms": db_manager.last_ping_ms}
+
 # Resume endpoints
 @api_router.get("/resume", response_model=dict)
-async def get_resume():
-    """Get complete resume data"""
+async def get_resume(request: Request, fields: Optional[str] = None):
+    """Get complete resume data, or only the top-level sections named in ?fields="""
+    try:
+        selected = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
-        resume = await ResumeDatabase.get_resume()
-        if not resume:
+        # Served from pre-serialized bytes (MongoDB _id already removed)
+        snapshot = await response_cache.get_snapshot()
+        if not snapshot:
             raise HTTPException(status_code=404, detail="Resume not found")
         
-        # Remove MongoDB _id field
-        resume.pop('_id', None)
-        return resume
+        if selected:
+            return snapshot.fields_response(selected, request)
+        return snapshot.response("resume", request)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching resume: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -72,6 +150,8 @@ async def get_resume():
 @api_router.put("/resume/personal-info")
 async def update_personal_info(
     personal_info: PersonalInfoUpdate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Update personal information (admin only)"""
@@ -82,13 +162,16 @@ async def update_personal_info(
         if not update_data:
             raise HTTPException(status_code=400, detail="No valid data provided")
         
-        success = await ResumeDatabase.update_personal_info(update_data)
-        if not success:
+        written = await ResumeDatabase.update_personal_info(update_data, if_match)
+        if not written:
             raise HTTPException(status_code=500, detail="Failed to update personal information")
         
-        return SuccessResponse(message="Personal information updated successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Personal information updated successfully", data=data)
     except HTTPException:
         raise
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error updating personal info: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -96,15 +179,20 @@ async def update_personal_info(
 @api_router.put("/resume/highlights")
 async def update_highlights(
     highlights_data: HighlightsUpdate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Update professional highlights (admin only)"""
     try:
-        success = await ResumeDatabase.update_highlights(highlights_data.highlights)
-        if not success:
+        written = await ResumeDatabase.update_highlights(highlights_data.highlights, if_match)
+        if not written:
             raise HTTPException(status_code=500, detail="Failed to update highlights")
         
-        return SuccessResponse(message="Highlights updated successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Highlights updated successfully", data=data)
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error updating highlights: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -112,26 +200,103 @@ async def update_highlights(
 @api_router.put("/resume/skills")
 async def update_skills(
     skills_data: SkillsUpdate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Update skills list (admin only)"""
     try:
-        success = await ResumeDatabase.update_skills(skills_data.skills)
-        if not success:
+        written = await ResumeDatabase.update_skills(skills_data.skills, if_match)
+        if not written:
             raise HTTPException(status_code=500, detail="Failed to update skills")
         
-        return SuccessResponse(message="Skills updated successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Skills updated successfully", data=data)
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error updating skills: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Pydantic model used to validate each batch operation's data
+BATCH_OPERATION_MODELS = {
+    BatchOperationType.UPDATE_PERSONAL_INFO: PersonalInfoUpdate,
+    BatchOperationType.SET_HIGHLIGHTS: HighlightsUpdate,
+    BatchOperationType.SET_SKILLS: SkillsUpdate,
+    BatchOperationType.ADD_EXPERIENCE: ExperienceCreate,
+    BatchOperationType.UPDATE_EXPERIENCE: ExperienceUpdate,
+    BatchOperationType.DELETE_EXPERIENCE: None,
+    BatchOperationType.ADD_EDUCATION: EducationCreate,
+    BatchOperationType.UPDATE_EDUCATION: EducationUpdate,
+    BatchOperationType.DELETE_EDUCATION: None,
+}
+
+def _prepare_batch_operation(operation: BatchOperation) -> dict:
+    """Validate one batch operation and shape its data like the single-item endpoints do"""
+    op = operation.op
+    model = BATCH_OPERATION_MODELS[op]
+    if op in (BatchOperationType.UPDATE_EXPERIENCE, BatchOperationType.DELETE_EXPERIENCE,
+              BatchOperationType.UPDATE_EDUCATION, BatchOperationType.DELETE_EDUCATION) and not operation.id:
+        raise ValueError("id is required")
+    
+    data = None
+    if model is not None:
+        validated = model(**(operation.data or {}))
+        if op == BatchOperationType.ADD_EXPERIENCE:
+            data = Experience(**validated.dict()).dict()
+        elif op == BatchOperationType.ADD_EDUCATION:
+            data = Education(**validated.dict()).dict()
+        else:
+            # Drop None values, as the PUT endpoints do
+            data = {k: v for k, v in validated.dict().items() if v is not None}
+            if not data:
+                raise ValueError("No valid data provided")
+    return {"op": op.value, "id": operation.id, "data": data}
+
+@api_router.patch("/resume/batch")
+async def batch_update_resume(
+    batch: ResumeBatchRequest,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
+    current_user: dict = Depends(require_admin)
+):
+    """Apply several resume edits in one atomic update (admin only)"""
+    operations = []
+    errors = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            operations.append(_prepare_batch_operation(operation))
+        except (ValidationError, ValueError) as e:
+            errors.append(BatchOperationResult(index=index, op=operation.op, success=False, id=operation.id, error=str(e)).dict())
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Invalid batch operations", "results": errors})
+    
+    try:
+        written, results = await ResumeDatabase.apply_batch(operations, if_match=if_match)
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
+    except ResumeConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error applying resume batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    results = [BatchOperationResult(**r).dict() for r in results]
+    if not written:
+        raise HTTPException(status_code=400, detail={"message": "Batch not applied", "results": results})
+    
+    data = resume_changed(response, written)
+    return SuccessResponse(message=f"Applied {len(results)} operations", data={"results": results, **data})
+
 # Experience endpoints
 @api_router.get("/resume/experience")
-async def get_experiences():
+async def get_experiences(request: Request):
     """Get all work experiences"""
     try:
-        experiences = await ResumeDatabase.get_experiences()
-        return {"experiences": experiences}
+        snapshot = await response_cache.get_snapshot()
+        if not snapshot:
+            return {"experiences": []}
+        return snapshot.response("experience", request)
     except Exception as e:
         logger.error(f"Error fetching experiences: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -139,6 +304,8 @@ async def get_experiences():
 @api_router.post("/resume/experience")
 async def add_experience(
     experience: ExperienceCreate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Add new work experience (admin only)"""
@@ -146,11 +313,14 @@ async def add_experience(
         # Convert to Experience model to get ID and timestamps
         exp_data = Experience(**experience.dict()).dict()
         
-        success = await ResumeDatabase.add_experience(exp_data)
-        if not success:
+        written = await ResumeDatabase.add_experience(exp_data, if_match)
+        if not written:
             raise HTTPException(status_code=500, detail="Failed to add experience")
         
-        return SuccessResponse(message="Experience added successfully", data={"id": exp_data["id"]})
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Experience added successfully", data={"id": exp_data["id"], **data})
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error adding experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -159,6 +329,8 @@ async def add_experience(
 async def update_experience(
     exp_id: str,
     experience: ExperienceUpdate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Update existing work experience (admin only)"""
@@ -169,13 +341,16 @@ async def update_experience(
         if not update_data:
             raise HTTPException(status_code=400, detail="No valid data provided")
         
-        success = await ResumeDatabase.update_experience(exp_id, update_data)
-        if not success:
+        written = await ResumeDatabase.update_experience(exp_id, update_data, if_match)
+        if not written:
             raise HTTPException(status_code=404, detail="Experience not found")
         
-        return SuccessResponse(message="Experience updated successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Experience updated successfully", data=data)
     except HTTPException:
         raise
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error updating experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -183,28 +358,35 @@ async def update_experience(
 @api_router.delete("/resume/experience/{exp_id}")
 async def delete_experience(
     exp_id: str,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Delete work experience (admin only)"""
     try:
-        success = await ResumeDatabase.delete_experience(exp_id)
-        if not success:
+        written = await ResumeDatabase.delete_experience(exp_id, if_match)
+        if not written:
             raise HTTPException(status_code=404, detail="Experience not found")
         
-        return SuccessResponse(message="Experience deleted successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Experience deleted successfully", data=data)
     except HTTPException:
         raise
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error deleting experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Education endpoints
 @api_router.get("/resume/education")
-async def get_education():
+async def get_education(request: Request):
     """Get all education entries"""
     try:
-        education = await ResumeDatabase.get_education()
-        return {"education": education}
+        snapshot = await response_cache.get_snapshot()
+        if not snapshot:
+            return {"education": []}
+        return snapshot.response("education", request)
     except Exception as e:
         logger.error(f"Error fetching education: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -212,17 +394,22 @@ async def get_education():
 @api_router.post("/resume/education")
 async def add_education(
     education: EducationCreate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Add new education entry (admin only)"""
     try:
         edu_data = Education(**education.dict()).dict()
         
-        success = await ResumeDatabase.add_education(edu_data)
-        if not success:
+        written = await ResumeDatabase.add_education(edu_data, if_match)
+        if not written:
             raise HTTPException(status_code=500, detail="Failed to add education")
         
-        return SuccessResponse(message="Education added successfully", data={"id": edu_data["id"]})
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Education added successfully", data={"id": edu_data["id"], **data})
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error adding education: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -231,6 +418,8 @@ async def add_education(
 async def update_education(
     edu_id: str,
     education: EducationUpdate,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Update existing education entry (admin only)"""
@@ -240,13 +429,16 @@ async def update_education(
         if not update_data:
             raise HTTPException(status_code=400, detail="No valid data provided")
         
-        success = await ResumeDatabase.update_education(edu_id, update_data)
-        if not success:
+        written = await ResumeDatabase.update_education(edu_id, update_data, if_match)
+        if not written:
             raise HTTPException(status_code=404, detail="Education entry not found")
         
-        return SuccessResponse(message="Education updated successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Education updated successfully", data=data)
     except HTTPException:
         raise
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error updating education: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -254,17 +446,22 @@ async def update_education(
 @api_router.delete("/resume/education/{edu_id}")
 async def delete_education(
     edu_id: str,
+    response: Response,
+    if_match: Optional[List[Tuple[int, str]]] = Depends(resume_if_match),
     current_user: dict = Depends(require_admin)
 ):
     """Delete education entry (admin only)"""
     try:
-        success = await ResumeDatabase.delete_education(edu_id)
-        if not success:
+        written = await ResumeDatabase.delete_education(edu_id, if_match)
+        if not written:
             raise HTTPException(status_code=404, detail="Education entry not found")
         
-        return SuccessResponse(message="Education deleted successfully")
+        data = resume_changed(response, written)
+        return SuccessResponse(message="Education deleted successfully", data=data)
     except HTTPException:
         raise
+    except ResumeVersionMismatch as e:
+        raise precondition_failed(e)
     except Exception as e:
         logger.error(f"Error deleting education: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -277,8 +474,11 @@ async def submit_contact_form(message: ContactMessageCreate):
         # Create contact message
         contact_data = ContactMessage(**message.dict()).dict()
         
-        # Save to database
-        message_id = await ContactDatabase.save_contact_message(contact_data)
+        # Queue for a batched write (or write directly if the queue isn't running)
+        if contact_ingest.running:
+            message_id = contact_ingest.submit(contact_data)
+        else:
+            message_id = await ContactDatabase.save_contact_message(contact_data)
         
         # Send email notification (mock for now)
         logger.info(f"New contact message received from {message.email}: {message.subject}")
@@ -287,47 +487,91 @@ async def submit_contact_form(message: ContactMessageCreate):
             message="Message sent successfully! Kyle will get back to you soon.",
             data={"message_id": message_id}
         )
+    except IngestQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many messages right now, please try again shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Error handling contact form: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to send message")
 
-# PDF generation endpoint
-@api_router.get("/resume/download-pdf")
-async def download_resume_pdf():
-    """Generate and download resume as PDF"""
+# Export endpoints
+async def _export_response(request: Request, format: str) -> Response:
+    """Serve one export format with validators, conditional GET and Range support"""
+    exporter = EXPORTERS.get(format.lower())
+    if exporter is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format, choose one of: {', '.join(sorted(EXPORTERS))}"
+        )
+    
     try:
-        # Get resume data
-        resume_data = await ResumeDatabase.get_resume()
-        if not resume_data:
+        snapshot = await response_cache.get_snapshot()
+        if not snapshot:
             raise HTTPException(status_code=404, detail="Resume not found")
         
-        # Generate PDF
-        pdf_bytes = pdf_generator.generate_resume_pdf(resume_data)
+        etag = make_etag(snapshot.cache_key, exporter.name, exporter.version)
+        headers = {
+            "Content-Disposition": f"attachment; filename=Kyle_Lynch_Resume.{exporter.extension}",
+            **validator_headers(etag, snapshot.last_modified)
+        }
+        if is_not_modified(request, [etag], snapshot.last_modified):
+            return not_modified_response(headers)
         
-        # Create response
-        buffer = BytesIO(pdf_bytes)
+        # Rendered once per resume version (the PDF usually in the background)
+        body = await export_engine.export(snapshot, exporter.name)
         
-        return StreamingResponse(
-            buffer,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=Kyle_Lynch_Resume.pdf"}
+        # Sent in fixed-size chunks straight from the cached buffer (supports Range)
+        return range_response(request, body, exporter.media_type, headers, etag)
+    except HTTPException:
+        raise
+    except RenderPoolSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF rendering is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
         )
     except Exception as e:
-        logger.error(f"Error generating PDF: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to generate PDF")
+        logger.error(f"Error exporting resume as {exporter.name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate {exporter.name.upper()}")
+
+@api_router.get("/resume/download")
+async def download_resume(request: Request, format: str = "pdf"):
+    """Download the resume as pdf, txt, md, html or json (JSON Resume schema)"""
+    return await _export_response(request, format)
+
+@api_router.get("/resume/download-pdf")
+async def download_resume_pdf(request: Request):
+    """Generate and download resume as PDF"""
+    return await _export_response(request, "pdf")
 
 # Authentication endpoints
 @api_router.post("/auth/login", response_model=Token)
-async def login(user_login: UserLogin):
+async def login(user_login: UserLogin, request: Request):
     """Admin login"""
+    ip = client_ip(request)
+    try:
+        # Reject floods before doing any bcrypt work
+        login_throttle.acquire(ip, user_login.username)
+    except LoginThrottled as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    
     try:
         user = await authenticate_user(user_login.username, user_login.password)
         if not user:
+            login_throttle.record_failure(user_login.username)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        login_throttle.record_success(user_login.username)
         
         # Update last login
         await UserDatabase.update_last_login(user["username"])
@@ -344,6 +588,8 @@ async def login(user_login: UserLogin):
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(status_code=500, detail="Login failed")
+    finally:
+        login_throttle.release(ip)
 
 @api_router.get("/auth/verify")
 async def verify_token(current_user: dict = Depends(get_current_user)):
@@ -366,16 +612,53 @@ async def logout():
 @api_router.get("/admin/contact-messages")
 async def get_contact_messages(
     current_user: dict = Depends(require_admin),
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[ContactStatus] = None,
+    include_body: bool = True
 ):
-    """Get contact messages (admin only)"""
+    """Get a page of contact messages, newest first (admin only)"""
     try:
-        messages = await ContactDatabase.get_contact_messages(limit)
-        return {"messages": messages}
+        messages, next_cursor = await ContactDatabase.get_contact_messages(
+            limit, cursor, status.value if status else None, include_body
+        )
+        return {"messages": messages, "next_cursor": next_cursor}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Error fetching contact messages: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/admin/contact-messages/export")
+async def export_contact_messages(
+    current_user: dict = Depends(require_admin),
+    status: Optional[ContactStatus] = None,
+    include_body: bool = True
+):
+    """Stream all matching contact messages as NDJSON (admin only)"""
+    async def ndjson():
+        async for message in ContactDatabase.iter_contact_messages(
+            status.value if status else None, include_body
+        ):
+            yield encode_json(message) + b"\n"
+    
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=contact_messages.ndjson"}
+    )
+
+@api_router.get("/admin/contact-messages/{message_id}")
+async def get_contact_message(
+    message_id: str,
+    current_user: dict = Depends(require_admin)
+):
+    """Get a single contact message with its body (admin only)"""
+    message = await ContactDatabase.get_contact_message(message_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return message
+
 @api_router.put("/admin/contact-messages/{message_id}/read")
 async def mark_message_read(
     message_id: str,
@@ -394,13 +677,63 @@ async def mark_message_read(
         logger.error(f"Error marking message as read: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats(current_user: dict = Depends(require_admin)):
+    """In-process cache counters (admin only)"""
+    return {
+        "resume": resume_cache.stats(),
+        "responses": response_cache.stats(),
+        "pdf": pdf_cache.stats(),
+        "exports": export_engine.stats(),
+        "principals": principal_cache.stats(),
+        "single_flight": single_flight.stats(),
+        "invalidation": invalidation_watcher.stats()
+    }
+
+@api_router.get("/admin/db-stats")
+async def get_db_stats(current_user: dict = Depends(require_admin)):
+    """MongoDB client settings and connection pool counters (admin only)"""
+    return {"mongo": db_manager.stats()}
+
+@api_router.get("/admin/index-stats")
+async def get_index_stats(current_user: dict = Depends(require_admin)):
+    """Index usage counters from $indexStats (admin only)"""
+    try:
+        return {"indexes": await index_usage_report()}
+    except Exception as e:
+        logger.error(f"Error fetching index stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/admin/contact-queue-stats")
+async def get_contact_queue_stats(current_user: dict = Depends(require_admin)):
+    """Contact ingestion queue counters (admin only)"""
+    return {"contact_queue": contact_ingest.stats()}
+
+@api_router.get("/admin/render-stats")
+async def get_render_stats(current_user: dict = Depends(require_admin)):
+    """PDF render pool timing and queue counters (admin only)"""
+    return {"pdf": render_pool.stats(), "prerender": pdf_prerenderer.stats()}
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Prometheus scrape endpoint (outside /api, like most exporters)
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    # Write out contact messages still waiting in the ingestion queue
+    await contact_ingest.stop()
+    await pdf_prerenderer.stop()
+    await invalidation_watcher.stop()
+    render_pool.shutdown()
+    password_executor.shutdown(wait=False)
+    db_manager.close()
     logger.info("Resume API server shutting down")
 
 if __name__ == "__main__":
@@ -0,0 +1,754 @@
+from bson import ObjectId, json_util
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import AutoReconnect, BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.results import DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import copy
+import functools
+import logging
+import re
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Stored documents round-trip ObjectIds and datetimes through extended JSON
+JSON_OPTIONS = json_util.JSONOptions(tz_aware=False)
+
+DUPLICATE_KEY = 11000
+
+# Field names that can be inlined into SQL (all of ours)
+_SIMPLE_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Query, update and projection evaluation shared by the embedded backends.
+# Covers the subset of MongoDB semantics database.py relies on.
+
+def _get_path(doc, path: str) -> list:
+    """Every value reachable through a dotted path (descending into arrays)"""
+    values = [doc]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    found.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    found.append(value[int(part)])
+                found.extend(item[part] for item in value if isinstance(item, dict) and part in item)
+        values = found
+    return values
+
+def _compare(op: str, a, b) -> bool:
+    try:
+        if op == "$lt":
+            return a < b
+        if op == "$lte":
+            return a <= b
+        if op == "$gt":
+            return a > b
+        return a >= b
+    except TypeError:
+        return False
+
+def _match_value(values: list, cond) -> bool:
+    expanded = []
+    for value in values:
+        expanded.append(value)
+        if isinstance(value, list):
+            expanded.extend(value)
+    if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+        for op, arg in cond.items():
+            if op in ("$lt", "$lte", "$gt", "$gte"):
+                if not any(_compare(op, v, arg) for v in expanded):
+                    return False
+            elif op == "$in":
+                if not any(v in arg for v in expanded):
+                    return False
+            elif op == "$ne":
+                if any(v == arg for v in expanded):
+                    return False
+            elif op == "$exists":
+                if bool(values) != bool(arg):
+                    return False
+            else:
+                raise OperationFailure(f"Unsupported query operator {op}")
+        return True
+    if cond is None:
+        # {"field": None} also matches documents without the field
+        return not values or None in expanded
+    return any(v == cond for v in expanded)
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif not _match_value(_get_path(doc, key), cond):
+            return False
+    return True
+
+def _positional_index(doc: dict, query: dict, array_field: str) -> int:
+    """Index of the first array element matched by the query (the "$" operator)"""
+    prefix = array_field + "."
+    conds = {k[len(prefix):]: v for k, v in query.items() if k.startswith(prefix)}
+    for i, item in enumerate(doc.get(array_field, [])):
+        if all(_match_value(_get_path(item, k), v) for k, v in conds.items()):
+            return i
+    raise OperationFailure("The positional operator did not find the match needed from the query")
+
+def _set_path(doc: dict, path: str, value, query: dict) -> None:
+    parts = path.split(".")
+    target = doc
+    for i, part in enumerate(parts[:-1]):
+        if part == "$":
+            target = target[_positional_index(doc, query, ".".join(parts[:i]))]
+        elif isinstance(target, list):
+            target = target[int(part)]
+        else:
+            target = target.setdefault(part, {})
+    if isinstance(target, list):
+        target[int(parts[-1])] = value
+    else:
+        target[parts[-1]] = value
+
+def _unset_path(doc: dict, path: str) -> None:
+    parts = path.split(".")
+    target = doc
+    for part in parts[:-1]:
+        target = target.get(part, {}) if isinstance(target, dict) else {}
+    if isinstance(target, dict):
+        target.pop(parts[-1], None)
+
+def apply_update(doc: dict, update: dict, query: dict, inserting: bool = False) -> bool:
+    """Apply update operators in place; returns whether the document changed"""
+    before = copy.deepcopy(doc)
+    for op, spec in update.items():
+        if op == "$set" or (op == "$setOnInsert" and inserting):
+            for path, value in spec.items():
+                _set_path(doc, path, copy.deepcopy(value), query)
+        elif op == "$setOnInsert":
+            continue
+        elif op == "$unset":
+            for path in spec:
+                _unset_path(doc, path)
+        elif op == "$inc":
+            for path, amount in spec.items():
+                _set_path(doc, path, (_get_path(doc, path) or [0])[0] + amount, query)
+        elif op == "$push":
+            for path, value in spec.items():
+                array = doc.setdefault(path, [])
+                if isinstance(value, dict) and "$each" in value:
+                    array.extend(copy.deepcopy(value["$each"]))
+                else:
+                    array.append(copy.deepcopy(value))
+        elif op == "$pull":
+            for path, cond in spec.items():
+                array = doc.get(path, [])
+                if isinstance(cond, dict):
+                    doc[path] = [x for x in array if not (isinstance(x, dict) and matches(x, cond))]
+                else:
+                    doc[path] = [x for x in array if x != cond]
+        else:
+            raise OperationFailure(f"Unsupported update operator {op}")
+    return doc != before
+
+def project(doc: dict, projection: Optional[dict]) -> dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {"_id": doc["_id"]} if projection.get("_id", 1) and "_id" in doc else {}
+        out.update({k: copy.deepcopy(doc[k]) for k in include if k in doc})
+        return out
+    exclude = {k for k, v in projection.items() if not v}
+    return {k: copy.deepcopy(v) for k, v in doc.items() if k not in exclude}
+
+def _sort_key(value):
+    # Missing values sort first and mixed types are grouped, roughly as in MongoDB
+    return (0, "", 0) if value is None else (1, type(value).__name__, value)
+
+def _sort_spec(key, direction=None) -> List[Tuple[str, int]]:
+    """Normalize the sort arguments pymongo accepts into [(field, direction)]"""
+    if not key:
+        return []
+    return [(key, direction or 1)] if isinstance(key, str) else list(key)
+
+def sort_documents(docs: List[dict], sort: List[Tuple[str, int]]) -> List[dict]:
+    for field, order in reversed(sort):
+        docs.sort(key=lambda doc: _sort_key((_get_path(doc, field) or [None])[0]), reverse=order < 0)
+    return docs
+
+class DocumentCursor:
+    """The part of Motor's cursor API database.py uses (sort, skip, limit, to_list).
+
+    Nothing is read until the results are requested, so the collection can
+    evaluate the query, sort, skip and limit together (see ``_select``).
+    """
+
+    def __init__(self, collection: "DocumentCollection", query: Optional[dict], projection: Optional[dict] = None):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key, direction=None):
+        self._sort = _sort_spec(key, direction)
+        return self
+
+    def skip(self, n: int):
+        self._skip = n
+        return self
+
+    def limit(self, n: int):
+        self._limit = n
+        return self
+
+    def _results(self) -> List[dict]:
+        docs = self._collection._select(self._query, self._sort, self._skip, self._limit)
+        return [project(doc, self._projection) for doc in docs]
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = await self._collection._run(self._results)
+        return results[:length] if length else results
+
+class _AsyncIterator:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+class DocumentCollection:
+    """Motor-compatible collection over an embedded store.
+
+    Subclasses provide the storage primitives (``_candidates``, ``_insert``,
+    ``_replace``, ``_delete`` and ``_transaction``); queries, updates and
+    projections are evaluated here, so both embedded backends behave the same.
+    Every operation is a synchronous method handed to ``_run``, which decides
+    where it executes.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.indexes: Dict[str, dict] = {}
+
+    # Storage primitives
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        """Execute one operation; in-process storage runs it inline"""
+        return fn(*args)
+
+    def _candidates(self, query: dict) -> List[dict]:
+        """Documents that may match ``query`` (a superset; they are filtered here)"""
+        raise NotImplementedError
+
+    def _select(self, query: dict, sort: List[Tuple[str, int]], skip: int, limit: int) -> List[dict]:
+        """Matching documents in ``sort`` order, after ``skip``, at most ``limit`` (0: all)"""
+        docs = sort_documents(self._find(query), sort)[skip:]
+        return docs[:limit] if limit else docs
+
+    def _insert(self, doc: dict) -> None:
+        raise NotImplementedError
+
+    def _replace(self, doc: dict) -> None:
+        raise NotImplementedError
+
+    def _delete(self, doc: dict) -> None:
+        raise NotImplementedError
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        yield
+
+    def _duplicate(self, index: str) -> DuplicateKeyError:
+        return DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {index}", DUPLICATE_KEY)
+
+    # Synchronous operations
+
+    def _find(self, query: Optional[dict]) -> List[dict]:
+        return [doc for doc in self._candidates(query or {}) if matches(doc, query)]
+
+    def _find_one(self, query: Optional[dict], projection: Optional[dict], sort) -> Optional[dict]:
+        found = self._select(query or {}, _sort_spec(sort), 0, 1)
+        return project(found[0], projection) if found else None
+
+    def _count(self, query: dict) -> int:
+        return len(self._find(query))
+
+    def _insert_one(self, doc: dict) -> object:
+        doc.setdefault("_id", ObjectId())
+        with self._transaction():
+            self._insert(copy.deepcopy(doc))
+        return doc["_id"]
+
+    def _insert_many(self, docs: List[dict], ordered: bool) -> List[object]:
+        errors = []
+        inserted = []
+        with self._transaction():
+            for index, doc in enumerate(docs):
+                doc.setdefault("_id", ObjectId())
+                try:
+                    self._insert(copy.deepcopy(doc))
+                    inserted.append(doc["_id"])
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": str(e), "op": doc})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return inserted
+
+    def _upsert(self, query: dict, update: dict) -> dict:
+        doc = {k: copy.deepcopy(v) for k, v in query.items()
+               if not k.startswith("$") and "." not in k and not isinstance(v, dict)}
+        doc.setdefault("_id", ObjectId())
+        apply_update(doc, update, query, inserting=True)
+        self._insert(copy.deepcopy(doc))
+        return doc
+
+    def _update_one(self, query: dict, update: dict, upsert: bool) -> UpdateResult:
+        with self._transaction():
+            found = self._select(query, [], 0, 1)
+            if not found:
+                if upsert:
+                    doc = self._upsert(query, update)
+                    return UpdateResult({"n": 1, "nModified": 0, "upserted": doc["_id"]}, True)
+                return UpdateResult({"n": 0, "nModified": 0}, True)
+            doc = copy.deepcopy(found[0])
+            modified = apply_update(doc, update, query)
+            if modified:
+                self._replace(doc)
+        return UpdateResult({"n": 1, "nModified": int(modified)}, True)
+
+    def _find_one_and_update(self, query: dict, update: dict, projection: Optional[dict], upsert: bool,
+                             return_document) -> Optional[dict]:
+        with self._transaction():
+            found = self._select(query, [], 0, 1)
+            if not found:
+                if upsert:
+                    doc = self._upsert(query, update)
+                    return project(doc, projection) if return_document == ReturnDocument.AFTER else None
+                return None
+            before = found[0]
+            doc = copy.deepcopy(before)
+            if apply_update(doc, update, query):
+                self._replace(doc)
+        return project(doc if return_document == ReturnDocument.AFTER else before, projection)
+
+    def _delete_one(self, query: dict) -> DeleteResult:
+        with self._transaction():
+            found = self._select(query, [], 0, 1)
+            if found:
+                self._delete(found[0])
+        return DeleteResult({"n": len(found)}, True)
+
+    def _create_index(self, keys, options: dict) -> str:
+        keys = [(keys, 1)] if isinstance(keys, str) else list(keys)
+        name = options.get("name") or "_".join(f"{k}_{d}" for k, d in keys)
+        self.indexes[name] = {"key": keys, **options}
+        return name
+
+    # Collection API
+
+    async def find_one(self, query=None, projection=None, sort=None, **kwargs) -> Optional[dict]:
+        return await self._run(self._find_one, query, projection, sort)
+
+    def find(self, query=None, projection=None, **kwargs) -> DocumentCursor:
+        return DocumentCursor(self, query, projection)
+
+    async def count_documents(self, query, **kwargs) -> int:
+        return await self._run(self._count, query or {})
+
+    async def insert_one(self, doc: dict, **kwargs) -> InsertOneResult:
+        return InsertOneResult(await self._run(self._insert_one, doc), True)
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True, **kwargs) -> InsertManyResult:
+        return InsertManyResult(await self._run(self._insert_many, docs, ordered), True)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False, **kwargs) -> UpdateResult:
+        return await self._run(self._update_one, query, update, upsert)
+
+    async def find_one_and_update(self, query: dict, update: dict, projection=None, upsert: bool = False,
+                                  return_document=ReturnDocument.BEFORE, **kwargs) -> Optional[dict]:
+        return await self._run(self._find_one_and_update, query, update, projection, upsert, return_document)
+
+    async def delete_one(self, query: dict, **kwargs) -> DeleteResult:
+        return await self._run(self._delete_one, query)
+
+    async def create_index(self, keys, **kwargs) -> str:
+        return await self._run(self._create_index, keys, kwargs)
+
+    async def index_information(self) -> dict:
+        return {"_id_": {"key": [("_id", 1)]}, **self.indexes}
+
+    def aggregate(self, pipeline, **kwargs) -> _AsyncIterator:
+        if pipeline and "$indexStats" in pipeline[0]:
+            # No usage counters are kept for embedded indexes
+            return _AsyncIterator([
+                {"name": name, "key": dict(index["key"]), "accesses": {"ops": 0}}
+                for name, index in {"_id_": {"key": [("_id", 1)]}, **self.indexes}.items()
+            ])
+        raise OperationFailure("Only $indexStats pipelines are supported by embedded storage")
+
+    def watch(self, *args, **kwargs):
+        # Same answer as a standalone mongod, so invalidation falls back
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+class MemoryCollection(DocumentCollection):
+    """Documents kept in a dict by _id, in insertion order"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._docs: Dict[object, dict] = {}
+
+    def _candidates(self, query: dict) -> List[dict]:
+        if "_id" in query and not isinstance(query["_id"], dict):
+            doc = self._docs.get(query["_id"])
+            return [doc] if doc is not None else []
+        return list(self._docs.values())
+
+    def _check_unique(self, doc: dict) -> None:
+        for name, index in self.indexes.items():
+            if not index.get("unique"):
+                continue
+            partial = index.get("partialFilterExpression")
+            if partial and not matches(doc, partial):
+                continue
+            key = [(_get_path(doc, field) or [None])[0] for field, _ in index["key"]]
+            for other in self._docs.values():
+                if other["_id"] == doc["_id"] or (partial and not matches(other, partial)):
+                    continue
+                if [(_get_path(other, field) or [None])[0] for field, _ in index["key"]] == key:
+                    raise self._duplicate(name)
+
+    def _insert(self, doc: dict) -> None:
+        if doc["_id"] in self._docs:
+            raise self._duplicate("_id_")
+        self._check_unique(doc)
+        self._docs[doc["_id"]] = doc
+
+    def _replace(self, doc: dict) -> None:
+        self._check_unique(doc)
+        self._docs[doc["_id"]] = doc
+
+    def _delete(self, doc: dict) -> None:
+        self._docs.pop(doc["_id"], None)
+
+# SQLite result codes (and their extended forms) for conditions that may clear
+# on a retry, as a dropped connection would for MongoDB
+_TRANSIENT_SQLITE_ERRORS = ("SQLITE_BUSY", "SQLITE_LOCKED", "SQLITE_IOERR", "SQLITE_CANTOPEN")
+
+@contextmanager
+def sqlite_errors() -> Iterator[None]:
+    """Raise sqlite3 errors as the pymongo errors callers already handle"""
+    try:
+        yield
+    except sqlite3.Error as e:
+        if getattr(e, "sqlite_errorname", "").startswith(_TRANSIENT_SQLITE_ERRORS):
+            raise AutoReconnect(f"SQLite: {str(e)}") from e
+        raise OperationFailure(f"SQLite: {str(e)}") from e
+
+class SqliteCollection(DocumentCollection):
+    """One table per collection: ``id`` (the extended-JSON _id) and a JSON ``doc`` column.
+
+    Filters on top-level fields (equality, ranges, $in, and $or/$and of those)
+    are translated to SQL over ``_value_expr``, the same expressions the
+    indexes from ``create_index`` are built on. When the whole query
+    translates, sort, skip and limit run in SQL too, so a page of results
+    decodes only the rows on that page. Anything else is evaluated in Python
+    on the candidate rows. Top-level fields holding arrays are not supported
+    in filters (none of ours do).
+
+    Statements run on the database's single worker thread (see ``_run``),
+    and their sqlite3 errors are raised as pymongo errors (``sqlite_errors``).
+    """
+
+    def __init__(self, name: str, conn: sqlite3.Connection, executor: ThreadPoolExecutor):
+        super().__init__(name)
+        self._conn = conn
+        self._executor = executor
+        self._table = f'"{name}"'
+        self._depth = 0
+        with sqlite_errors():
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self._table} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        # One thread per database file: operations (and their transactions)
+        # never interleave, and lock waits never block the event loop
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(self._call, fn, *args)
+        )
+
+    @staticmethod
+    def _call(fn: Callable[..., Any], *args) -> Any:
+        with sqlite_errors():
+            return fn(*args)
+
+    @staticmethod
+    def _key(value) -> str:
+        return json_util.dumps(value, json_options=JSON_OPTIONS)
+
+    @staticmethod
+    def _value_expr(field: str) -> str:
+        """SQL for a top-level field's value, ordered like MongoDB orders it.
+
+        Datetimes are stored as ISO strings whose fraction is omitted when
+        zero, so they are normalized to a fixed-width form that sorts
+        correctly. ObjectIds are only compared through ``id``.
+        """
+        if field == "_id":
+            return "id"
+        return (f"COALESCE(strftime('%Y-%m-%d %H:%M:%f', json_extract(doc, '$.{field}.\"$date\"')), "
+                f"json_extract(doc, '$.{field}'))")
+
+    def _sql_value(self, field: str, value):
+        """Parameter comparable with ``_value_expr(field)``, or None if there isn't one"""
+        if field == "_id":
+            return self._key(value) if isinstance(value, ObjectId) else None
+        if isinstance(value, datetime):
+            return value.strftime("%Y-%m-%d %H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        return None
+
+    @staticmethod
+    def _sql_literal(value) -> str:
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return str(int(value) if isinstance(value, bool) else value)
+
+    # SQL comparison for each query operator we translate
+    _OPERATORS = {"$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">="}
+
+    def _condition(self, field: str, cond) -> Tuple[Optional[str], list, bool]:
+        """(clause, params, exact) for one field's condition; clause None means "any row" """
+        if field != "_id" and not _SIMPLE_FIELD.match(field):
+            return None, [], False
+        expr = self._value_expr(field)
+        if not (isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond)):
+            value = self._sql_value(field, cond)
+            if value is None:
+                return None, [], False
+            if isinstance(value, bool):
+                # Inlined so partial indexes on flags (WHERE active = 1) apply
+                return f"{expr} = {self._sql_literal(value)}", [], True
+            return f"{expr} = ?", [value], True
+        clauses, params, exact = [], [], True
+        for op, arg in cond.items():
+            if op in self._OPERATORS and self._sql_value(field, arg) is not None:
+                clauses.append(f"{expr} {self._OPERATORS[op]} ?")
+                params.append(self._sql_value(field, arg))
+            elif op == "$in" and arg and all(self._sql_value(field, v) is not None for v in arg):
+                clauses.append(f"{expr} IN ({', '.join('?' * len(arg))})")
+                params.extend(self._sql_value(field, v) for v in arg)
+            else:
+                exact = False
+        return (" AND ".join(clauses) or None), params, exact
+
+    def _where(self, query: dict) -> Tuple[Optional[str], list, bool]:
+        """Translate ``query``: (clause matching a superset of it, params, whether it is exact)"""
+        clauses, params, exact = [], [], True
+        for key, cond in query.items():
+            if key in ("$or", "$and"):
+                parts = [self._where(sub) for sub in cond]
+                exact = exact and all(part_exact for _, _, part_exact in parts)
+                if key == "$or" and any(clause is None for clause, _, _ in parts):
+                    # One branch can match any row, so the $or cannot narrow anything
+                    exact = False
+                    continue
+                joiner = " OR " if key == "$or" else " AND "
+                kept = [(clause, part_params) for clause, part_params, _ in parts if clause is not None]
+                if kept:
+                    clauses.append("(" + joiner.join(f"({clause})" for clause, _ in kept) + ")")
+                    for _, part_params in kept:
+                        params.extend(part_params)
+                continue
+            clause, cond_params, cond_exact = self._condition(key, cond)
+            exact = exact and cond_exact
+            if clause is not None:
+                clauses.append(clause)
+                params.extend(cond_params)
+        return (" AND ".join(clauses) or None), params, exact
+
+    def _query_rows(self, query: dict, suffix: str = "", suffix_params: tuple = ()) -> List[dict]:
+        clause, params, _ = self._where(query)
+        where = f" WHERE {clause}" if clause else ""
+        rows = self._conn.execute(f"SELECT doc FROM {self._table}{where}{suffix}",
+                                  (*params, *suffix_params)).fetchall()
+        return [json_util.loads(row[0], json_options=JSON_OPTIONS) for row in rows]
+
+    def _candidates(self, query: dict) -> List[dict]:
+        return self._query_rows(query)
+
+    def _select(self, query: dict, sort: List[Tuple[str, int]], skip: int, limit: int) -> List[dict]:
+        _, _, exact = self._where(query)
+        if not exact or not all(field == "_id" or _SIMPLE_FIELD.match(field) for field, _ in sort):
+            return super()._select(query, sort, skip, limit)
+        suffix = ""
+        if sort:
+            suffix += " ORDER BY " + ", ".join(
+                f"{self._value_expr(field)} {'DESC' if order < 0 else 'ASC'}" for field, order in sort
+            )
+        suffix_params = ()
+        if limit or skip:
+            suffix += " LIMIT ? OFFSET ?"
+            suffix_params = (limit or -1, skip)
+        # The Python check is a safety net for the few cases SQL compares differently
+        return [doc for doc in self._query_rows(query, suffix, suffix_params) if matches(doc, query)]
+
+    def _count(self, query: dict) -> int:
+        clause, params, exact = self._where(query)
+        if not exact:
+            return super()._count(query)
+        where = f" WHERE {clause}" if clause else ""
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self._table}{where}", params).fetchone()[0]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE serializes read-modify-write cycles across processes
+        if self._depth:
+            yield
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        else:
+            self._conn.execute("COMMIT")
+        finally:
+            self._depth -= 1
+
+    def _write(self, sql: str, params: tuple) -> None:
+        try:
+            self._conn.execute(sql, params)
+        except sqlite3.IntegrityError as e:
+            raise self._duplicate(self._index_name(str(e)))
+
+    def _insert(self, doc: dict) -> None:
+        self._write(f"INSERT INTO {self._table} (id, doc) VALUES (?, ?)",
+                    (self._key(doc["_id"]), json_util.dumps(doc, json_options=JSON_OPTIONS)))
+
+    def _replace(self, doc: dict) -> None:
+        self._write(f"UPDATE {self._table} SET doc = ? WHERE id = ?",
+                    (json_util.dumps(doc, json_options=JSON_OPTIONS), self._key(doc["_id"])))
+
+    def _delete(self, doc: dict) -> None:
+        self._conn.execute(f"DELETE FROM {self._table} WHERE id = ?", (self._key(doc["_id"]),))
+
+    def _create_index(self, keys, options: dict) -> str:
+        name = super()._create_index(keys, options)
+        index = self.indexes[name]
+        fields = [field for field, _ in index["key"]]
+        if not all(field == "_id" or _SIMPLE_FIELD.match(field) for field in fields):
+            # Array paths (experience.id) cannot be indexed with json_extract
+            return name
+
+        where = ""
+        partial = index.get("partialFilterExpression")
+        if partial:
+            if not all(_SIMPLE_FIELD.match(f) and isinstance(v, (bool, int, float, str)) for f, v in partial.items()):
+                logger.warning(f"Skipping SQLite index {name} on {self.name}: unsupported partial filter")
+                return name
+            # Partial index predicates must be literals
+            where = " WHERE " + " AND ".join(f"{self._value_expr(f)} = {self._sql_literal(v)}"
+                                             for f, v in partial.items())
+        unique = "UNIQUE " if index.get("unique") else ""
+        columns = ", ".join(f"{self._value_expr(field)} {'DESC' if order < 0 else 'ASC'}"
+                            for field, order in index["key"])
+        try:
+            self._conn.execute(
+                f'CREATE {unique}INDEX IF NOT EXISTS "{self.name}__{name}" ON {self._table} ({columns}){where}'
+            )
+        except sqlite3.IntegrityError as e:
+            raise OperationFailure(f"Index {name} on {self.name} conflicts with existing data: {str(e)}",
+                                   code=DUPLICATE_KEY)
+        return name
+
+    def _index_name(self, message: str) -> str:
+        # e.g. "UNIQUE constraint failed: index 'users__username_unique'" (or "users.id" for the key)
+        for name in self.indexes:
+            if f"'{self.name}__{name}'" in message:
+                return name
+        return "_id_"
+
+class EmbeddedDatabase:
+    """Collections created on first access, like a Motor database"""
+
+    def __init__(self):
+        self._collections: Dict[str, DocumentCollection] = {}
+
+    def __getattr__(self, name: str) -> DocumentCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> DocumentCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = self._create_collection(name)
+        return collection
+
+    def _create_collection(self, name: str) -> DocumentCollection:
+        raise NotImplementedError
+
+    async def command(self, command, **kwargs) -> dict:
+        if command != "ping":
+            raise OperationFailure(f"Unsupported command {command}")
+        return {"ok": 1.0}
+
+    def close(self) -> None:
+        pass
+
+class MemoryDatabase(EmbeddedDatabase):
+    """Process-local storage; everything is lost on restart (tests, benchmarks)"""
+
+    def _create_collection(self, name: str) -> DocumentCollection:
+        return MemoryCollection(name)
+
+class SqliteDatabase(EmbeddedDatabase):
+    """A single SQLite file in WAL mode, shared safely by several worker processes.
+
+    Statements run on one worker thread per database, so waiting on another
+    process's write lock (``busy_timeout``) or reading a large page never
+    stalls the event loop.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        with sqlite_errors():
+            self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # With WAL, NORMAL only syncs at checkpoints and is still crash-safe
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA busy_timeout=5000")
+
+    def _create_collection(self, name: str) -> DocumentCollection:
+        return SqliteCollection(name, self._conn, self._executor)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._conn.close()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules read their settings at import time; keep everything in process
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from cache import ResumeCache, ResumeDelta
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+def warm_cache() -> ResumeCache:
+    cache = ResumeCache()
+    cache.set({
+        "_id": "r1",
+        "version": 1,
+        "skills": ["Python"],
+        "personal_info": {"name": "A"},
+        "experience": [{"id": "a", "company": "A"}],
+    })
+    return cache
+
+def test_apply_patches_the_cached_copy():
+    cache = warm_cache()
+    before = cache.get()
+    with cache.writing() as write:
+        cache.apply(write, [ResumeDelta("merge", "personal_info", {"title": "T"}),
+                            ResumeDelta("update_item", "experience", {"company": "B"}, "a"),
+                            ResumeDelta("push", "experience", {"id": "b"})], NOW, 2)
+    resume = cache.get()
+    assert resume["personal_info"] == {"name": "A", "title": "T"}
+    assert resume["experience"] == [{"id": "a", "company": "B"}, {"id": "b"}]
+    assert resume["version"] == 2 and resume["updated_at"] == NOW
+    # The previous document (still held by snapshots) is left untouched
+    assert before["experience"] == [{"id": "a", "company": "A"}]
+    assert before["skills"] is resume["skills"]
+    assert cache.version == 1 and cache.patches == 1
+
+def test_apply_invalidates_when_it_cannot_patch():
+    cache = warm_cache()
+    with cache.writing() as write:
+        # Another write landed in between (version 2)
+        cache.apply(write, [ResumeDelta("set", "skills", ["SQL"])], NOW, 3)
+    assert cache.get() is None and cache.version == 1
+
+    cache = warm_cache()
+    with cache.writing() as write:
+        cache.apply(write, [ResumeDelta("update_item", "experience", {"company": "B"}, "missing")], NOW, 2)
+    assert cache.get() is None
+
+    cache = warm_cache()
+    with cache.writing() as first, cache.writing() as second:
+        cache.apply(second, [ResumeDelta("set", "skills", ["SQL"])], NOW, 2)
+    assert first.overlapped and cache.get() is None
+
+def test_changed_since():
+    cache = warm_cache()
+    with cache.writing() as write:
+        cache.apply(write, [ResumeDelta("set", "skills", ["SQL"])], NOW, 2)
+    with cache.writing() as write:
+        cache.apply(write, [ResumeDelta("pull", "experience", item_id="a")], NOW, 3)
+    assert cache.changed_since(2) == set()
+    assert cache.changed_since(1) == {"experience", "updated_at", "version"}
+    assert cache.changed_since(0) == {"skills", "experience", "updated_at", "version"}
+    assert cache.is_current(3) and not cache.is_current(4)
+
+    cache.invalidate(broadcast=False)
+    assert cache.changed_since(2) is None
+    # Older than the recorded history
+    assert ResumeCache(history=1).changed_since(-5) is None
+
+def test_listeners_follow_local_changes():
+    cache = warm_cache()
+    calls = []
+    cache.listeners.append(lambda: calls.append(cache.version))
+    with cache.writing() as write:
+        cache.apply(write, [ResumeDelta("set", "skills", [])], NOW, 2)
+    cache.invalidate(broadcast=False)
+    cache.invalidate()
+    assert calls == [1, 3]
@@ -0,0 +1,38 @@
+from bson.errors import InvalidDocument
+import asyncio
+
+import database
+from contact_ingest import ContactIngestQueue
+from database import ContactDatabase
+from storage import MemoryDatabase
+
+def test_failed_batches_are_spooled_and_the_worker_keeps_running(tmp_path, monkeypatch):
+    database.db_manager.bind(MemoryDatabase())
+    save = ContactDatabase.save_contact_messages
+    failures = [InvalidDocument("cannot encode object"), RuntimeError("disk I/O error")]
+
+    async def flaky_save(messages):
+        if failures:
+            raise failures.pop(0)
+        return await save(messages)
+
+    monkeypatch.setattr(ContactDatabase, "save_contact_messages", flaky_save)
+
+    async def scenario():
+        queue = ContactIngestQueue(batch_size=10, flush_interval=0.01,
+                                   spool_path=str(tmp_path / "spool.ndjson"), retry_interval=0.05)
+        await queue.start()
+        ids = [queue.submit({"name": "a", "message": "m"})]
+        await asyncio.sleep(0.05)
+        ids.append(queue.submit({"name": "b", "message": "m"}))
+        await asyncio.sleep(0.05)
+        assert queue.running and queue.spooled == 2
+        ids.append(queue.submit({"name": "c", "message": "m"}))
+        # Written directly, then the spool is replayed in the next quiet period
+        await asyncio.sleep(0.2)
+        await queue.stop()
+        stored = await database.contacts_collection.find({}).to_list(length=None)
+        assert sorted(str(doc["_id"]) for doc in stored) == sorted(ids)
+        assert queue.written == 3
+
+    asyncio.run(scenario())
@@ -0,0 +1,148 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+
+import database
+from cache import resume_cache
+from database import ContactDatabase, ResumeDatabase, ResumeVersionMismatch
+from storage import MemoryDatabase
+
+@pytest.fixture(autouse=True)
+def memory_db():
+    database.db_manager.bind(MemoryDatabase())
+    resume_cache.invalidate(broadcast=False)
+    asyncio.run(database.ensure_indexes())
+    yield
+    resume_cache.invalidate(broadcast=False)
+
+async def stored_resume() -> dict:
+    return await database.resumes_collection.find_one({"active": True})
+
+def test_section_reads():
+    async def scenario():
+        await ResumeDatabase.get_resume()
+        stored = await stored_resume()
+        resume_cache.invalidate(broadcast=False)
+        # Cold: projected reads that leave the full document uncached
+        assert await ResumeDatabase.get_experiences() == stored["experience"]
+        assert await ResumeDatabase.get_education() == stored["education"]
+        assert await ResumeDatabase.get_resume_fields(["skills", "missing"]) == {"skills": stored["skills"]}
+        assert not resume_cache.is_warm
+        await ResumeDatabase.get_resume()
+        assert await ResumeDatabase.get_experiences() == stored["experience"]
+
+    asyncio.run(scenario())
+
+def test_writes_keep_the_cache_equal_to_the_store():
+    async def scenario():
+        await ResumeDatabase.get_resume()
+        patches = resume_cache.patches
+        await ResumeDatabase.add_experience({"id": "new", "company": "C", "position": "P"})
+        await ResumeDatabase.update_experience("new", {"company": "D"})
+        await ResumeDatabase.update_personal_info({"title": "Engineer"})
+        await ResumeDatabase.apply_batch([
+            {"op": "set_skills", "data": {"skills": ["Python"]}},
+            {"op": "add_experience", "data": {"id": "batch", "company": "E"}},
+            {"op": "delete_experience", "id": "new"},
+        ])
+        # Every write patched the cache instead of dropping it
+        assert resume_cache.patches == patches + 4
+        assert await ResumeDatabase.get_resume() == await stored_resume()
+
+    asyncio.run(scenario())
+
+def test_writes_return_the_new_version():
+    async def scenario():
+        resume = await ResumeDatabase.get_resume()
+        written = await ResumeDatabase.add_experience({"id": "new", "company": "C"})
+        assert written == {"_id": resume["_id"], "version": resume["version"] + 1}
+        # Nothing matched, so the version stays put
+        assert await ResumeDatabase.update_experience("missing", {"company": "X"}) is None
+        assert await ResumeDatabase.delete_education("missing") is None
+        assert (await stored_resume())["version"] == written["version"]
+
+    asyncio.run(scenario())
+
+def test_if_match():
+    async def scenario():
+        resume = await ResumeDatabase.get_resume()
+        current = [(resume["version"], str(resume["_id"]))]
+        written = await ResumeDatabase.update_skills(["Go"], current)
+        assert written["version"] == resume["version"] + 1
+
+        with pytest.raises(ResumeVersionMismatch) as e:
+            await ResumeDatabase.update_skills(["Rust"], current)
+        assert e.value.current["version"] == written["version"]
+        # Same version of some other resume document
+        with pytest.raises(ResumeVersionMismatch):
+            await ResumeDatabase.update_skills(["Rust"], [(written["version"], "0" * 24)])
+        with pytest.raises(ResumeVersionMismatch):
+            await ResumeDatabase.apply_batch([{"op": "set_skills", "data": {"skills": ["Rust"]}}], if_match=[])
+        assert (await stored_resume())["skills"] == ["Go"]
+
+    asyncio.run(scenario())
+
+def test_batch_applies_every_operation_in_one_write():
+    async def scenario():
+        before = await ResumeDatabase.get_resume()
+        written, results = await ResumeDatabase.apply_batch([
+            {"op": "set_skills", "data": {"skills": ["Python"]}},
+            {"op": "add_experience", "data": {"id": "new", "company": "C"}},
+            {"op": "update_experience", "id": "new", "data": {"company": "D"}},
+            {"op": "delete_education", "id": before["education"][0]["id"]},
+        ])
+        assert [r["success"] for r in results] == [True] * 4
+        assert written["version"] == before["version"] + 1
+        resume = await stored_resume()
+        assert resume["skills"] == ["Python"]
+        assert resume["experience"][-1]["company"] == "D"
+        assert len(resume["education"]) == len(before["education"]) - 1
+
+    asyncio.run(scenario())
+
+def test_batch_writes_nothing_if_an_operation_fails():
+    async def scenario():
+        await ResumeDatabase.get_resume()
+        before = await stored_resume()
+        written, results = await ResumeDatabase.apply_batch([
+            {"op": "set_skills", "data": {"skills": ["Python"]}},
+            {"op": "update_experience", "id": "missing", "data": {"company": "X"}},
+            {"op": "rename_everything"},
+        ])
+        assert written is None
+        assert [r["success"] for r in results] == [True, False, False]
+        assert results[1]["error"] == "Experience not found"
+        assert await stored_resume() == before
+
+    asyncio.run(scenario())
+
+def test_contact_pages_cover_every_message_once():
+    async def scenario():
+        start = datetime(2024, 1, 1)
+        await ContactDatabase.save_contact_messages([
+            {"name": f"n{i}", "message": "m", "status": "read" if i % 3 else "new",
+             "created_at": start + timedelta(minutes=i % 4)} for i in range(25)
+        ])
+        seen, cursor = [], None
+        while True:
+            page, cursor = await ContactDatabase.get_contact_messages(10, cursor, include_body=False)
+            seen.extend(page)
+            if not cursor:
+                break
+        assert len(seen) == 25 and len({m["_id"] for m in seen}) == 25
+        assert all("message" not in m for m in seen)
+        keys = [(m["created_at"], m["_id"]) for m in seen]
+        assert keys == sorted(keys, reverse=True)
+
+        new = [m async for m in ContactDatabase.iter_contact_messages(status="new", batch_size=2)]
+        assert [m["_id"] for m in new] == [m["_id"] for m in seen if m["status"] == "new"]
+
+    asyncio.run(scenario())
+
+def test_contact_cursor_round_trip():
+    doc = {"_id": ObjectId(), "created_at": datetime(2024, 1, 1, 12, 30)}
+    assert ContactDatabase.decode_cursor(ContactDatabase.encode_cursor(doc)) == (doc["created_at"], doc["_id"])
+    with pytest.raises(ValueError):
+        ContactDatabase.decode_cursor("not-a-cursor")
@@ -0,0 +1,35 @@
+import pytest
+
+from http_cache import _parse_range, if_match_versions, version_etag
+
+RESUME_ID = "65a1b2c3d4e5f60718293a4b"
+
+def test_parse_range():
+    assert _parse_range("bytes=0-99", 1000) == (0, 99)
+    assert _parse_range("bytes=900-", 1000) == (900, 999)
+    assert _parse_range("bytes=-100", 1000) == (900, 999)
+    assert _parse_range("bytes=990-2000", 1000) == (990, 999)
+    assert _parse_range("bytes=-5000", 1000) == (0, 999)
+
+def test_parse_range_ignored():
+    for header in ("items=0-1", "bytes=0-1,5-6", "bytes=5-1", "bytes=a-b", "bytes=-", "bytes=0"):
+        assert _parse_range(header, 1000) is None
+
+def test_parse_range_unsatisfiable():
+    with pytest.raises(ValueError):
+        _parse_range("bytes=1000-", 1000)
+    with pytest.raises(ValueError):
+        _parse_range("bytes=-0", 1000)
+
+def test_if_match_versions():
+    assert if_match_versions(None) is None
+    assert if_match_versions('*') is None
+    assert if_match_versions(version_etag(7, RESUME_ID)) == [(7, RESUME_ID)]
+    # Body ETags carry the version tag plus a suffix
+    header = f'"v7.{RESUME_ID}-gzip", "v8.{RESUME_ID}"'
+    assert if_match_versions(header) == [(7, RESUME_ID), (8, RESUME_ID)]
+
+def test_if_match_versions_rejects_other_tags():
+    # Weak tags, tags without the resume _id and content hashes never match
+    header = f'W/"v7.{RESUME_ID}", "v7", "0123abcd"'
+    assert if_match_versions(header) == []
@@ -0,0 +1,18 @@
+import asyncio
+import os
+
+from pdf_cache import PdfCache
+
+def test_disk_tier_keeps_the_newest_entries(tmp_path):
+    cache = PdfCache(max_entries=1, cache_dir=str(tmp_path), max_disk_entries=2)
+
+    async def scenario():
+        for version in range(1, 5):
+            await cache.put(f"v{version}-pdf", b"%PDF-" + str(version).encode())
+            # Distinct mtimes even on coarse filesystem clocks
+            os.utime(tmp_path / f"v{version}-pdf.pdf", (version, version))
+
+    asyncio.run(scenario())
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["v3-pdf.pdf", "v4-pdf.pdf"]
+    assert bytes(cache.get("v3-pdf")) == b"%PDF-3"
+    assert cache.get("v1-pdf") is None
@@ -0,0 +1,18 @@
+from data.mock import resumeData
+from pdf_generator import render_resume_pdf
+from resume_ir import build_resume_ir
+
+def test_render_reports_each_stage():
+    resume = {
+        "personal_info": resumeData["personalInfo"],
+        "highlights": resumeData["highlights"],
+        "experience": resumeData["experience"],
+        "education": resumeData["education"],
+        "skills": resumeData["skills"],
+    }
+    stages = []
+    pdf_bytes = render_resume_pdf(build_resume_ir(resume), on_stage=lambda name, seconds: stages.append(name))
+    assert pdf_bytes.startswith(b"%PDF-")
+    assert stages == ["header", "highlights", "experience", "education", "skills", "layout"]
+    # Same document with or without the hook
+    assert len(render_resume_pdf(build_resume_ir(resume))) == len(pdf_bytes)
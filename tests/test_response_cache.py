@@ -0,0 +1,42 @@
+from datetime import datetime
+from starlette.requests import Request
+import gzip
+
+from response_cache import EncodedBody, ResumeSnapshot, encode_json
+
+RESUME = {
+    "_id": "65a1b2c3d4e5f60718293a4b",
+    "version": 4,
+    "updated_at": datetime(2024, 1, 1),
+    "skills": ["Python", "SQL"],
+    "experience": [{"id": "a", "company": "A"}],
+    "education": [],
+}
+
+def test_encoded_body_negotiation():
+    body = EncodedBody(encode_json({"skills": RESUME["skills"] * 50}), "v4.x")
+    assert gzip.decompress(body.variants["gzip"]) == body.variants["identity"]
+    assert body.negotiate(None) == "identity"
+    assert body.negotiate("gzip;q=0, identity") == "identity"
+    assert body.negotiate("gzip") == "gzip"
+    assert body.etags["identity"] == '"v4.x"' and body.etags["gzip"] != body.etags["identity"]
+
+def test_snapshot_bodies_match_plain_serialization():
+    snapshot = ResumeSnapshot(1, RESUME)
+    public = {k: v for k, v in RESUME.items() if k != "_id"}
+    assert snapshot.bodies["resume"].variants["identity"] == encode_json(public)
+    assert snapshot.bodies["experience"].variants["identity"] == encode_json({"experiences": RESUME["experience"]})
+
+def test_snapshot_reuses_unchanged_bodies():
+    snapshot = ResumeSnapshot(1, RESUME)
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    assert snapshot.fields_response(("skills",), request).body == b'{"skills":["Python","SQL"]}'
+    snapshot.fields_response(("education",), request)
+
+    patched = dict(RESUME, skills=["Go"], version=5)
+    following = ResumeSnapshot(2, patched, snapshot, {"skills", "version"})
+    assert following.bodies["experience"] is snapshot.bodies["experience"]
+    assert following.bodies["resume"].variants["identity"] == encode_json(
+        {k: v for k, v in patched.items() if k != "_id"})
+    # ?fields= bodies survive only if none of their fields changed
+    assert set(following._field_bodies) == {("education",)}
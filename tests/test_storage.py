@@ -0,0 +1,131 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo.errors import AutoReconnect, DuplicateKeyError, OperationFailure
+import asyncio
+import sqlite3
+
+import pytest
+
+from storage import MemoryDatabase, SqliteDatabase, apply_update, matches
+
+RESUME = {
+    "active": True,
+    "version": 3,
+    "skills": ["Python", "SQL"],
+    "experience": [{"id": "a", "company": "A"}, {"id": "b", "company": "B"}],
+}
+
+def test_matches_equality_and_arrays():
+    assert matches(RESUME, {"active": True, "version": 3})
+    assert matches(RESUME, {"skills": "SQL"})
+    assert matches(RESUME, {"experience.id": "b"})
+    assert not matches(RESUME, {"experience.id": "c"})
+    assert matches(RESUME, {"missing": None})
+
+def test_matches_operators():
+    assert matches(RESUME, {"version": {"$gte": 3, "$lt": 4}})
+    assert not matches(RESUME, {"version": {"$gt": 3}})
+    assert matches(RESUME, {"version": {"$in": [1, 3]}})
+    assert matches(RESUME, {"version": {"$ne": 2}})
+    assert matches(RESUME, {"missing": {"$exists": False}})
+    assert matches(RESUME, {"$or": [{"version": 1}, {"skills": "Python"}]})
+    assert not matches(RESUME, {"$and": [{"version": 3}, {"active": False}]})
+    # Mismatched types never compare, as in MongoDB
+    assert not matches(RESUME, {"version": {"$gt": "2"}})
+    with pytest.raises(OperationFailure):
+        matches(RESUME, {"version": {"$regex": "3"}})
+
+def test_apply_update_operators():
+    doc = {"version": 1, "personal_info": {"name": "A"}, "experience": [{"id": "a", "company": "A"}]}
+    assert apply_update(doc, {"$set": {"personal_info.title": "T"}, "$inc": {"version": 1}}, {})
+    assert doc["personal_info"] == {"name": "A", "title": "T"}
+    assert doc["version"] == 2
+
+    query = {"experience.id": "a"}
+    apply_update(doc, {"$set": {"experience.$.company": "B"}}, query)
+    assert doc["experience"] == [{"id": "a", "company": "B"}]
+
+    apply_update(doc, {"$push": {"experience": {"$each": [{"id": "b"}, {"id": "c"}]}}}, {})
+    apply_update(doc, {"$pull": {"experience": {"id": "b"}}}, {})
+    assert [e["id"] for e in doc["experience"]] == ["a", "c"]
+
+    apply_update(doc, {"$unset": {"personal_info": ""}}, {})
+    assert "personal_info" not in doc
+
+def test_apply_update_reports_changes():
+    doc = {"skills": ["Python"]}
+    assert not apply_update(doc, {"$set": {"skills": ["Python"]}}, {})
+    assert not apply_update(doc, {"$setOnInsert": {"created": 1}}, {})
+    assert apply_update(doc, {"$setOnInsert": {"created": 1}}, {}, inserting=True)
+    with pytest.raises(OperationFailure):
+        apply_update(doc, {"$rename": {"skills": "tags"}}, {})
+    with pytest.raises(OperationFailure):
+        apply_update({"experience": []}, {"$set": {"experience.$.company": "X"}}, {"experience.id": "a"})
+
+@pytest.fixture(params=["memory", "sqlite"])
+def db(request, tmp_path):
+    db = MemoryDatabase() if request.param == "memory" else SqliteDatabase(str(tmp_path / "test.sqlite3"))
+    yield db
+    db.close()
+
+def test_cursor_round_trip(db):
+    async def scenario():
+        contacts = db.contact_messages
+        await contacts.create_index([("created_at", -1), ("_id", -1)], name="created_at_id")
+        start = datetime(2024, 1, 1)
+        docs = [{"_id": ObjectId(), "created_at": start + timedelta(minutes=i % 7),
+                 "status": "new" if i % 3 else "read", "body": f"m{i}"} for i in range(30)]
+        await contacts.insert_many(docs)
+
+        expected = sorted(docs, key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+        cursor = contacts.find({}, {"body": 0}).sort([("created_at", -1), ("_id", -1)])
+        page = await cursor.skip(5).limit(10).to_list(length=10)
+        assert [d["_id"] for d in page] == [d["_id"] for d in expected[5:15]]
+        assert all("body" not in d and isinstance(d["created_at"], datetime) for d in page)
+
+        # Keyset continuation from the last document of the page
+        last = page[-1]
+        after = {"$or": [{"created_at": {"$lt": last["created_at"]}},
+                         {"created_at": last["created_at"], "_id": {"$lt": last["_id"]}}]}
+        rest = await contacts.find(after).sort([("created_at", -1), ("_id", -1)]).to_list(length=None)
+        assert [d["_id"] for d in rest] == [d["_id"] for d in expected[15:]]
+
+        read = [d async for d in contacts.find({"status": "read"}).sort([("created_at", 1), ("_id", 1)])]
+        assert [d["_id"] for d in read] == [d["_id"] for d in sorted(
+            (d for d in docs if d["status"] == "read"), key=lambda d: (d["created_at"], d["_id"]))]
+        assert await contacts.count_documents({"status": "read"}) == len(read)
+        assert await contacts.find_one({"_id": docs[0]["_id"]}) == docs[0]
+
+    asyncio.run(scenario())
+
+def test_unique_index(db):
+    async def scenario():
+        users = db.users
+        await users.create_index("username", unique=True, name="username_unique")
+        await users.insert_one({"username": "admin"})
+        with pytest.raises(DuplicateKeyError) as e:
+            await users.insert_one({"username": "admin"})
+        assert "index: username_unique" in str(e.value)
+        assert await users.count_documents({}) == 1
+
+    asyncio.run(scenario())
+
+def test_sqlite_errors_are_pymongo_errors(tmp_path):
+    path = tmp_path / "test.sqlite3"
+    db = SqliteDatabase(str(path))
+    db._conn.execute("PRAGMA busy_timeout=0")
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process holds the write lock
+        with pytest.raises(AutoReconnect):
+            asyncio.run(db.users.insert_one({"username": "admin"}))
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+        db.close()
+
+    corrupt = tmp_path / "corrupt.sqlite3"
+    corrupt.write_bytes(b"not a database" * 512)
+    with pytest.raises(OperationFailure):
+        SqliteDatabase(str(corrupt))